@@ -0,0 +1,26 @@
+# Internal Libraries
+from . import e2e, micro, startup
+
+# Python Libraries
+import argparse
+import asyncio
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmark the document validation pipeline.")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+    e2e.add_arguments(subparsers.add_parser("e2e", help="drive /validate against stub OCR and LLM servers"))
+    micro.add_arguments(subparsers.add_parser("micro", help="time rasterization and preprocessing in-process"))
+    startup.add_arguments(subparsers.add_parser("startup", help="measure cold import time and RSS of the servers"))
+    args = parser.parse_args()
+
+    if args.mode == "e2e":
+        asyncio.run(e2e.run_e2e(args))
+    elif args.mode == "micro":
+        micro.run_micro(args)
+    else:
+        startup.run_startup(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# Installed Libraries
+from PIL import Image, ImageDraw, ImageFilter
+
+# Python Libraries
+import io
+import random
+from typing import List, NamedTuple
+
+# Page size of an A4 scan at the 200 DPI poppler rasterizes at
+PAGE_SIZE = (1654, 2339)
+
+# Text of one page per prompt_schema type, written so the classifier and the
+# rules recognize the type the way they would on a real scan
+SAMPLE_LINES = {
+    "aadhaar": [
+        "Government of India", "Unique Identification Authority of India",
+        "Name: Ravi Kumar", "DOB: 14/08/1998", "Male",
+        "Address: 12 Gandhi Street, Chennai, Tamil Nadu 600001", "4821 7730 5196", "Aadhaar - Aam Aadmi ka Adhikar",
+    ],
+    "birth_cert": [
+        "Birth Certificate", "Registration of Births and Deaths Act", "Name: Ravi Kumar",
+        "Date of Birth: 14-08-1998", "Place of Birth: Chennai", "Name of Father: Suresh Kumar",
+        "Name of Mother: Lakshmi Kumar", "Registrar of Births",
+    ],
+    "marksheet": [
+        "Statement of Marks", "Name: Ravi Kumar", "Roll No: 2311045", "Date of Birth: 14-08-1998",
+        "Father's Name: Suresh Kumar", "Mother's Name: Lakshmi Kumar",
+        "Subject Maximum Marks Marks Obtained", "Mathematics 100 91", "Physics 100 88", "Chemistry 100 85",
+        "Grand Total 300 264",
+    ],
+    "degree_cert": [
+        "Anna University", "Convocation", "The degree of Bachelor of Engineering",
+        "is conferred on Ravi Kumar", "Date of Birth: 14-08-1998", "CGPA: 8.7", "Percentage: 84.5",
+        "First Class with Distinction", "In testimony whereof the seal of the University is affixed",
+    ],
+    "proof_of_class": [
+        "Statement of Marks", "Name: Ravi Kumar", "Class: XII", "Marks Obtained", "Grand Total 500 451",
+    ],
+    "provisional_cert": [
+        "Provisional Certificate", "Anna University", "This is to certify that Ravi Kumar",
+        "has passed the Bachelor of Engineering degree examination", "Year of Passing: 2020",
+    ],
+    "experience_cert": [
+        "Experience Certificate", "To whom it may concern",
+        "Ravi Kumar was working with Acme Technologies", "Date of Joining: 2020-07-01",
+        "Date of Relieving: 2023-06-30", "He was employed as a Software Engineer",
+    ],
+    "gate_score_card": [
+        "Graduate Aptitude Test in Engineering", "GATE Score Card", "Name: Ravi Kumar",
+        "Registration Number: CS20S51023456", "Year: 2020", "Marks out of 100: 61.33",
+        "All India Rank in this paper: 1432", "GATE Score: 712",
+    ],
+    "proof_of_category": [
+        "Community Certificate", "This is to certify that Ravi Kumar", "belongs to the Backward Class community",
+        "Category: BC",
+    ],
+    "proof_of_address": [
+        "Residence Certificate", "This is to certify that Ravi Kumar is a resident of",
+        "Address: 12 Gandhi Street, Chennai, Tamil Nadu 600001",
+    ],
+    "phd_cert": [
+        "Doctor of Philosophy", "Anna University", "Name: Ravi Kumar", "Date of Registration: 2018-01-15",
+        "Thesis: Low latency document understanding", "Papers published: 4", "Conferences attended: 3",
+    ],
+}
+
+# Filler appended to later pages of multi-page documents
+FILLER_LINES = [
+    "This document is issued for official purposes only.",
+    "Any alteration renders this document invalid.",
+    "Verify the authenticity of this document online.",
+]
+
+# Kinds of synthetic documents, see make_document
+KINDS = ("image", "scanned_pdf", "text_pdf")
+
+
+class SyntheticDocument(NamedTuple):
+    name: str
+    document_type: str
+    kind: str
+    pages: int
+    content_type: str
+    data: bytes
+
+
+def page_lines(document_type: str, page: int) -> List[str]:
+    if page == 0:
+        return SAMPLE_LINES[document_type]
+    return [f"Page {page + 1}"] + FILLER_LINES
+
+
+def render_page(lines: List[str], scanned: bool = True, seed: int = 0) -> Image.Image:
+    """
+    Draw a page of text. Scanned pages get a grey background, a diagonal
+    watermark, noise and a slight skew, like a phone photo of a printout.
+    """
+    rng = random.Random(seed)
+    page = Image.new("L", PAGE_SIZE, 235 if scanned else 255)
+    y = 150
+    for line in lines:
+        # The default bitmap font is tiny at 200 DPI, so it is drawn large on a strip and scaled
+        strip = Image.new("L", (len(line) * 6 + 4, 12), 255)
+        ImageDraw.Draw(strip).text((2, 0), line, fill=0)
+        strip = strip.resize((strip.width * 4, strip.height * 4))
+        page.paste(strip, (120, y))
+        y += 70
+
+    if scanned:
+        watermark = Image.new("L", PAGE_SIZE, 0)
+        ImageDraw.Draw(watermark).text((400, 1100), "SAMPLE " * 6, fill=255)
+        watermark = watermark.rotate(30)
+        page.paste(190, mask=watermark.point(lambda v: 90 if v else 0))
+        noise = Image.effect_noise(PAGE_SIZE, 18)
+        page = Image.blend(page, noise, 0.08)
+        page = page.rotate(rng.uniform(-1.5, 1.5), fillcolor=235).filter(ImageFilter.GaussianBlur(0.6))
+    return page.convert("RGB")
+
+
+def encode_image(image: Image.Image, format: str = "PNG") -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def escape_pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_text_pdf(pages: List[List[str]]) -> bytes:
+    """Write a PDF whose pages carry a real text layer, in Helvetica."""
+    width, height = 595, 842
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        text = "".join(f"({escape_pdf_text(line)}) Tj 0 -18 Td " for line in lines)
+        stream = f"BT /F1 11 Tf 50 {height - 60} Td {text}ET".encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (width, height, content_id)
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_document(document_type: str, kind: str, pages: int = 1, seed: int = 0) -> SyntheticDocument:
+    """
+    Build one synthetic upload.
+
+    Args:
+        document_type (str): A prompt_schema type.
+        kind (str): "image" for a single scanned PNG, "scanned_pdf" for image-only
+            PDF pages, "text_pdf" for pages with an embedded text layer.
+        pages (int): Page count, ignored for images.
+        seed (int): Seed for the scan noise and skew.
+
+    Returns:
+        SyntheticDocument: The upload and what it contains.
+    """
+    if kind == "image":
+        data = encode_image(render_page(page_lines(document_type, 0), seed=seed))
+        return SyntheticDocument(f"{document_type}-image", document_type, kind, 1, "image/png", data)
+
+    page_texts = [page_lines(document_type, page) for page in range(pages)]
+    if kind == "text_pdf":
+        data = make_text_pdf(page_texts)
+    elif kind == "scanned_pdf":
+        images = [render_page(lines, seed=seed + page) for page, lines in enumerate(page_texts)]
+        buffer = io.BytesIO()
+        images[0].save(buffer, format="PDF", save_all=True, append_images=images[1:], resolution=200)
+        data = buffer.getvalue()
+    else:
+        raise ValueError(f"Unknown document kind: {kind}")
+    return SyntheticDocument(f"{document_type}-{kind}-{pages}p", document_type, kind, pages, "application/pdf", data)
+
+
+def make_corpus(document_types: List[str], kinds=KINDS, page_counts=(1, 3)) -> List[SyntheticDocument]:
+    """Every combination of type, kind and page count, images only once per type."""
+    documents = []
+    for document_type in document_types:
+        for kind in kinds:
+            for pages in ((1,) if kind == "image" else page_counts):
+                documents.append(make_document(document_type, kind, pages, seed=len(documents)))
+    return documents
@@ -0,0 +1,183 @@
+# Installed Libraries
+import httpx
+
+# Internal Libraries
+from .documents import make_corpus, KINDS
+from .report import summarize, peak_rss_mb, format_seconds, print_table, write_json
+
+# Python Libraries
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def start_process(args: list, env: dict) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable] + args, cwd=BASE_DIR, env=env)
+
+
+async def wait_until_up(url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode} before starting")
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+
+def build_request(base_url: str, document) -> dict:
+    """/validate only takes Aadhaar cards, other types go through /validate-packet."""
+    file = (f"{document.name}.{'png' if document.content_type == 'image/png' else 'pdf'}", document.data, document.content_type)
+    if document.document_type == "aadhaar":
+        return {"url": f"{base_url}/validate", "files": {"file": file}}
+    return {
+        "url": f"{base_url}/validate-packet",
+        "files": {"files": file},
+        "data": {"document_types": document.document_type},
+    }
+
+
+async def drive(base_url: str, documents: list, total: int, concurrency: int, timeout: float) -> dict:
+    """
+    Send total requests with concurrency of them in flight, cycling through documents.
+
+    Returns:
+        dict: Latencies per document name, error count and wall time.
+    """
+    latencies = {document.name: [] for document in documents}
+    errors = []
+    queue = itertools.islice(itertools.cycle(documents), total)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        async def worker():
+            for document in queue:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(**build_request(base_url, document))
+                    if response.status_code >= 500:
+                        errors.append(f"{document.name}: HTTP {response.status_code}")
+                        continue
+                except httpx.HTTPError as e:
+                    errors.append(f"{document.name}: {e!r}")
+                    continue
+                latencies[document.name].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall_seconds = time.perf_counter() - started
+
+    return {"latencies": latencies, "errors": errors, "wall_seconds": wall_seconds}
+
+
+async def run_e2e(args) -> dict:
+    """
+    Start stub OCR and LLM servers and a real poppler server wired to them,
+    drive /validate and report latency, throughput and peak RSS per server.
+    """
+    documents = make_corpus(args.types, args.kinds, args.pages)
+    print(f"Generated {len(documents)} synthetic document(s)")
+
+    env = dict(os.environ)
+    env.update({
+        "OCR_SERVERS": f"127.0.0.1:{args.port + 1}",
+        "LLM_SERVERS": f"127.0.0.1:{args.port + 2}",
+        "JOBS_ENABLED": "0",
+        "CACHE_PERSISTENT": "0",
+        "IS_CUDA_CHECK_NEEDED": "0",
+        "CUDA_CONFIGURED": "0",
+    })
+    env.update(dict(setting.split("=", 1) for setting in args.env))
+    servers = {
+        "ocr_stub": (start_process(["-m", "bench.stubs", "ocr", "--port", str(args.port + 1), "--latency", args.ocr_latency], env),
+                     f"http://127.0.0.1:{args.port + 1}/health"),
+        "llm_stub": (start_process(["-m", "bench.stubs", "llm", "--port", str(args.port + 2), "--latency", args.llm_latency], env),
+                     f"http://127.0.0.1:{args.port + 2}/health"),
+        "poppler": (start_process(["-m", "uvicorn", "poppler.main:app", "--host", "127.0.0.1", "--port", str(args.port),
+                                   "--log-level", "warning"], env),
+                    f"http://127.0.0.1:{args.port}/backends"),
+    }
+    try:
+        startup = {}
+        for name, (process, url) in servers.items():
+            started = time.perf_counter()
+            await wait_until_up(url, process, args.startup_timeout)
+            startup[name] = time.perf_counter() - started
+
+        base_url = f"http://127.0.0.1:{args.port}"
+        if args.warmup:
+            await drive(base_url, documents, args.warmup, args.concurrency, args.timeout)
+        result = await drive(base_url, documents, args.requests, args.concurrency, args.timeout)
+        # Including poppler's CPU pool workers
+        rss = {name: peak_rss_mb(process.pid, include_children=True) for name, (process, _) in servers.items()}
+    finally:
+        for process, _ in servers.values():
+            process.terminate()
+        for process, _ in servers.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    all_latencies = [latency for latencies in result["latencies"].values() for latency in latencies]
+    report = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "errors": len(result["errors"]),
+        "throughput_rps": len(all_latencies) / result["wall_seconds"],
+        "overall": summarize(all_latencies),
+        "documents": {name: summarize(latencies) for name, latencies in result["latencies"].items()},
+        "startup_seconds": startup,
+        "peak_rss_mb": rss,
+    }
+    print_report(report, result["errors"])
+    if args.output:
+        write_json(args.output, report)
+    return report
+
+
+def print_report(report: dict, errors: list):
+    rows = [{"document": "overall", **report["overall"]}]
+    rows += [{"document": name, **stats} for name, stats in report["documents"].items()]
+    print_table(rows, [
+        ("document", "document", str),
+        ("count", "n", str),
+        ("p50", "p50", format_seconds),
+        ("p95", "p95", format_seconds),
+        ("p99", "p99", format_seconds),
+        ("max", "max", format_seconds),
+    ])
+    print(f"\nThroughput: {report['throughput_rps']:.2f} req/s at concurrency {report['concurrency']}, "
+          f"{report['errors']} error(s)")
+    for name, rss in report["peak_rss_mb"].items():
+        startup = report["startup_seconds"].get(name)
+        print(f"{name}: peak RSS {'-' if rss is None else f'{rss:.0f}MB'}, up in {format_seconds(startup)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+
+
+def add_arguments(parser):
+    parser.add_argument("--types", nargs="+", default=["aadhaar"], help="prompt_schema types to generate documents for")
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    parser.add_argument("--pages", nargs="+", type=int, default=[1, 3], help="page counts of the PDF documents")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--ocr-latency", default="lognormal:-1.2,0.4", help="per page, see bench.stubs.Latency")
+    parser.add_argument("--llm-latency", default="lognormal:0.3,0.3", help="per request, see bench.stubs.Latency")
+    parser.add_argument("--port", type=int, default=18000, help="poppler port, the stubs take the next two")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="settings for the servers, e.g. OCR_PDF_PASSTHROUGH=0 POPPLER_PAGE_TRANSPORT=png")
+    parser.add_argument("--output", help="write the report as JSON to this path")
@@ -0,0 +1,152 @@
+# Internal Libraries
+from .documents import make_document, encode_image, render_page, page_lines
+from .report import summarize, peak_rss_mb, format_seconds, print_table, write_json
+
+# Python Libraries
+import asyncio
+import io
+import time
+
+
+def time_calls(fn, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def poppler_benchmarks(pdf_data: bytes, page_png: bytes, document_type: str) -> dict:
+    from poppler.process_pdf import convert_pdf_to_images
+    from poppler.preprocess import preprocess_image
+
+    return {
+        "poppler.convert_pdf_to_images": lambda: asyncio.run(convert_pdf_to_images(pdf_data)),
+        "poppler.preprocess_image": lambda: preprocess_image(page_png, document_type),
+        # The binarizing profile, which replaced watermark removal
+        "poppler.preprocess_image[gate_score_card]": lambda: preprocess_image(page_png, "gate_score_card"),
+    }
+
+
+def ocr_benchmarks(pdf_data: bytes) -> dict:
+    from ocr.extract import PdfPageRenderer
+
+    def render_all():
+        renderer = PdfPageRenderer(pdf_data)
+        try:
+            renderer.render_pages(range(len(renderer)))
+        finally:
+            renderer.close()
+
+    return {"ocr.PdfPageRenderer.render_pages": render_all}
+
+
+def transport_benchmarks(page_image) -> dict:
+    """
+    Ways to move one grayscale page from poppler to the OCR server, as
+    (encode, decode) pairs of callables. PIL PNG is the original path.
+    """
+    from PIL import Image
+    from common.page_codec import Page, encode_pages, decode_pages, available_codecs
+
+    gray = page_image.convert("L")
+
+    def pil_png_encode():
+        buffer = io.BytesIO()
+        gray.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def pil_png_decode(data):
+        return Image.open(io.BytesIO(data)).convert("RGB")
+
+    def frames_decode(data):
+        return [Image.frombuffer(page.mode, (page.width, page.height), page.data, "raw", page.mode, 0, 1).convert("RGB")
+                for page in decode_pages(data)]
+
+    transports = {"png (PIL)": (pil_png_encode, pil_png_decode)}
+    try:
+        import numpy as np
+        from poppler.preprocess import encode_png
+        pixels = np.asarray(gray)
+        transports["png (cv2, level 1)"] = (lambda: encode_png(pixels), pil_png_decode)
+    except ImportError:
+        pass
+    page = Page("L", gray.width, gray.height, gray.tobytes())
+    for codec in available_codecs():
+        transports[f"frames ({codec})"] = (lambda codec=codec: encode_pages([page], codec), frames_decode)
+    return transports
+
+
+def run_transport(page_image, repeat: int) -> list:
+    rows = []
+    for name, (encode, decode) in transport_benchmarks(page_image).items():
+        data = encode()
+        encode_times = time_calls(encode, repeat)
+        decode_times = time_calls(lambda: decode(data), repeat)
+        rows.append({
+            "transport": name,
+            "bytes": len(data),
+            "encode": summarize(encode_times)["p50"],
+            "decode": summarize(decode_times)["p50"],
+            "total": summarize([e + d for e, d in zip(encode_times, decode_times)])["p50"],
+        })
+    print_table(rows, [
+        ("transport", "page transport", str),
+        ("bytes", "bytes on the wire", lambda value: f"{value / 1024:.0f}KB"),
+        ("encode", "encode p50", format_seconds),
+        ("decode", "decode p50", format_seconds),
+        ("total", "encode+decode p50", format_seconds),
+    ])
+    return rows
+
+
+def run_micro(args) -> dict:
+    """
+    Time the CPU-bound stages on the real code paths, one scanned PDF of
+    args.pages pages per run. A stage whose dependencies are not installed
+    is reported as skipped.
+    """
+    pdf = make_document(args.type, "scanned_pdf", args.pages)
+    page_png = encode_image(render_page(page_lines(args.type, 0)))
+    print(f"Benchmarking on a {args.pages}-page scanned PDF ({len(pdf.data) // 1024}KB), {args.repeat} run(s) each")
+
+    rows = []
+    for loader in (lambda: poppler_benchmarks(pdf.data, page_png, args.type), lambda: ocr_benchmarks(pdf.data)):
+        try:
+            benchmarks = loader()
+        except ImportError as e:
+            print(f"Skipped: {e}")
+            continue
+        for name, fn in benchmarks.items():
+            try:
+                fn()  # Warm up imports and lazily loaded state
+            except Exception as e:
+                # e.g. pdf2image without the poppler binaries on PATH
+                print(f"Skipped {name}: {e}")
+                continue
+            rows.append({"stage": name, **summarize(time_calls(fn, args.repeat))})
+
+    print_table(rows, [
+        ("stage", "stage", str),
+        ("count", "n", str),
+        ("mean", "mean", format_seconds),
+        ("p50", "p50", format_seconds),
+        ("p95", "p95", format_seconds),
+        ("max", "max", format_seconds),
+    ])
+    print()
+    transports = run_transport(render_page(page_lines(args.type, 0)), args.repeat)
+    rss = peak_rss_mb()
+    print(f"\nPeak RSS: {'-' if rss is None else f'{rss:.0f}MB'}")
+    report = {"pages": args.pages, "repeat": args.repeat, "stages": rows, "transports": transports, "peak_rss_mb": rss}
+    if args.output:
+        write_json(args.output, report)
+    return report
+
+
+def add_arguments(parser):
+    parser.add_argument("--type", default="aadhaar", help="prompt_schema type of the test document")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write the report as JSON to this path")
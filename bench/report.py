@@ -0,0 +1,82 @@
+# Python Libraries
+import json
+import os
+import resource
+import sys
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile, None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies: list) -> dict:
+    return {
+        "count": len(latencies),
+        "mean": sum(latencies) / len(latencies) if latencies else None,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else None,
+    }
+
+
+def child_pids(pid: int) -> list:
+    """Live descendants of a process, read from /proc."""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children += [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+    return children + [descendant for child in children for descendant in child_pids(child)]
+
+
+def peak_rss_mb(pid: int = None, include_children: bool = False):
+    """
+    Peak resident set size of a process in MB, read from /proc. Without a pid,
+    the current process's peak is used. None where /proc is unavailable.
+
+    With include_children, the peaks of its live descendants, such as a
+    server's worker processes, are added. Peaks need not coincide, so the sum
+    is an upper bound.
+    """
+    if pid is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in KB elsewhere
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    peak = None
+    for process in [pid] + (child_pids(pid) if include_children else []):
+        try:
+            with open(f"/proc/{process}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peak = (peak or 0) + int(line.split()[1]) / 1024
+        except OSError:
+            # Exited since it was listed
+            continue
+    return peak
+
+
+def format_seconds(value) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}ms"
+
+
+def print_table(rows: list, columns: list):
+    """Print dicts as a fixed-width table, columns is a list of (key, header, formatter)."""
+    cells = [[header for _, header, _ in columns]]
+    cells += [[formatter(row.get(key)) for key, _, formatter in columns] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(columns))]
+    for row in cells:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def write_json(path: str, report: dict):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {path}")
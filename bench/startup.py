@@ -0,0 +1,88 @@
+# Internal Libraries
+from .report import summarize, format_seconds, print_table, write_json
+
+# Python Libraries
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Imported after the module under test, to show how much each lazily loaded dependency adds
+HEAVY_MODULES = ["torch", "torchvision", "cv2", "pdf2image", "pymongo", "numpy"]
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def measure_import(module: str) -> dict:
+    """Import module in a fresh interpreter and return its import time, peak RSS and heavy modules pulled in."""
+    process = subprocess.Popen(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BASE_DIR, stdout=subprocess.PIPE, text=True,
+    )
+    started = time.perf_counter()
+    output = process.stdout.read()
+    # wait4 gives this child's own resource usage, ru_maxrss is in KB on Linux
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - started
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed with exit code {process.returncode}")
+    import_seconds, _, loaded = output.strip().rpartition("\n")[2].partition(" ")
+    return {
+        "import": float(import_seconds),
+        "process": wall,
+        "rss_mb": usage.ru_maxrss / 1024,
+        "heavy_modules": loaded.split(",") if loaded else [],
+    }
+
+
+def run_startup(args) -> dict:
+    """
+    Measure cold start of each server module: time to import it in a fresh
+    interpreter and the resulting peak RSS. Run it on two checkouts to compare.
+    """
+    rows = []
+    for module in args.modules:
+        try:
+            runs = [measure_import(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"Skipped: {e}")
+            continue
+        imports = summarize([run["import"] for run in runs])
+        rows.append({
+            "module": module,
+            "import_p50": imports["p50"],
+            "import_max": imports["max"],
+            "process_p50": summarize([run["process"] for run in runs])["p50"],
+            "rss_mb": max(run["rss_mb"] for run in runs),
+            "heavy_modules": runs[-1]["heavy_modules"],
+        })
+
+    print_table(rows, [
+        ("module", "module", str),
+        ("import_p50", "import p50", format_seconds),
+        ("import_max", "import max", format_seconds),
+        ("process_p50", "process p50", format_seconds),
+        ("rss_mb", "peak RSS", lambda value: f"{value:.0f}MB"),
+        ("heavy_modules", "heavy modules loaded", lambda value: ", ".join(value) or "-"),
+    ])
+    report = {"repeat": args.repeat, "modules": rows}
+    if args.output:
+        write_json(args.output, report)
+    return report
+
+
+def add_arguments(parser):
+    parser.add_argument("--modules", nargs="+", default=["poppler.main"], help="server modules to import")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the report as JSON to this path")
@@ -0,0 +1,135 @@
+# Installed Libraries
+import uvicorn
+from fastapi import FastAPI, File, UploadFile, Form, Request
+
+# Internal Libraries
+from .documents import SAMPLE_LINES
+from common.page_codec import HEADER, is_page_frames, available_codecs
+
+# Python Libraries
+import argparse
+import asyncio
+import random
+import re
+
+# Values the stub LLM answers with, any other key gets a placeholder
+SAMPLE_VALUES = {
+    "name": "Ravi Kumar",
+    "aadhaar_number": "482177305196",
+    "date_of_birth": "14-08-1998",
+    "address": "12 Gandhi Street, Chennai, Tamil Nadu 600001",
+    "gender": "Male",
+    "father_name": "Suresh Kumar",
+    "mother_name": "Lakshmi Kumar",
+    "roll_number": "2311045",
+    "university": "Anna University",
+    "degree": "Bachelor of Engineering",
+    "cgpa": "8.7",
+    "percentage": "84.5",
+    "class": "First Class with Distinction",
+    "passing_year": "2020",
+    "from_date": "2020-07-01",
+    "to_date": "2023-06-30",
+    "registration_number": "CS20S51023456",
+    "year": "2020",
+    "marks_out_of_100": "61.33",
+    "all_india_rank_in_this_paper": "1432",
+    "gate_score": "712",
+    "category": "BC",
+}
+
+
+class Latency:
+    """
+    A latency distribution in seconds, parsed from a spec such as
+    "const:0.2", "uniform:0.1,0.4", "normal:0.3,0.05" or "lognormal:-1.5,0.4".
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        values = [float(value) for value in params.split(",") if value]
+        samplers = {
+            "const": lambda: values[0],
+            "uniform": lambda: random.uniform(values[0], values[1]),
+            "normal": lambda: random.gauss(values[0], values[1]),
+            "lognormal": lambda: random.lognormvariate(values[0], values[1]),
+        }
+        if kind not in samplers:
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.sampler = samplers[kind]
+
+    def sample(self) -> float:
+        return max(0.0, self.sampler())
+
+    async def sleep(self, times: int = 1):
+        await asyncio.sleep(sum(self.sample() for _ in range(times)))
+
+
+def count_pdf_pages(data: bytes) -> int:
+    return max(1, len(re.findall(rb"/Type\s*/Page(?!s)", data)))
+
+
+def create_ocr_app(latency: Latency) -> FastAPI:
+    """Stand-in for the OCR server. Each page costs one latency sample."""
+    app = FastAPI()
+
+    @app.post("/extract-text")
+    async def extract_text(file: UploadFile = File(...), document_type: str = Form(None),
+                           first_page: int = Form(1), last_page: int = Form(None)):
+        data = await file.read()
+        page_count = 1
+        if data[:5] == b"%PDF-":
+            total = count_pdf_pages(data)
+            page_count = max(1, min(last_page or total, total) - first_page + 1)
+        elif is_page_frames(data):
+            page_count = max(1, HEADER.unpack_from(data)[3])
+        await latency.sleep(page_count)
+        first_text = "\n".join(SAMPLE_LINES.get(document_type, SAMPLE_LINES["aadhaar"]))
+        page_texts = [first_text] + [f"Page {first_page + page}" for page in range(1, page_count)]
+        return {
+            "extracted_text": "\n\n".join(page_texts),
+            "page_texts": page_texts,
+            "pages": [{"page": first_page + page, "source": "ocr"} for page in range(page_count)],
+        }
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "page_codecs": available_codecs()}
+
+    return app
+
+
+def create_llm_app(latency: Latency) -> FastAPI:
+    """Stand-in for the LLM server, answering with the sample value of every schema key."""
+    app = FastAPI()
+
+    @app.post("/process-data")
+    async def process_data(request: Request):
+        data = await request.json()
+        await latency.sleep()
+        values = [data.get("document_type") or "other"]
+        values += [SAMPLE_VALUES.get(key, f"sample {key}") for key in data.get("schema") or {}]
+        return {"result": repr(values), "model": "stub", "prompt_tokens": len(data.get("raw_text") or "") // 4,
+                "prompt_tokens_saved": 0}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub OCR or LLM server for benchmarking.")
+    parser.add_argument("server", choices=["ocr", "llm"])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency", default="const:0", help="e.g. const:0.2, uniform:0.1,0.4, lognormal:-1.5,0.4")
+    args = parser.parse_args()
+
+    create_app = create_ocr_app if args.server == "ocr" else create_llm_app
+    uvicorn.run(create_app(Latency(args.latency)), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
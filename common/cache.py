@@ -0,0 +1,130 @@
+# Internal Libraries
+from config.settings import CACHE_SCHEMA_VERSION, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_PERSISTENT
+
+# Python Libraries
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(namespace: str, document_type, *parts) -> str:
+    """
+    Build a content-addressed key from the document content, its type and the
+    cache schema version. Parts may be bytes or str.
+    """
+    digest = hashlib.sha256()
+    for part in (namespace, CACHE_SCHEMA_VERSION, document_type or "", *parts):
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        # Length prefix keeps ("ab", "c") and ("a", "bc") apart
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """In-process LRU cache with a size bound and a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class MongoCacheTier:
+    """Persistent cache tier stored in the Mongo `cache` collection."""
+
+    def __init__(self, collection, ttl_seconds: float):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        # Mongo removes expired entries on its own once this index exists
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    def get(self, key: str):
+        doc = self.collection.find_one({"_id": key})
+        if doc is None or doc["expires_at"].replace(tzinfo=timezone.utc) < datetime.now(timezone.utc):
+            return None
+        return doc["value"]
+
+    def set(self, key: str, value):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        self.collection.replace_one(
+            {"_id": key},
+            {"_id": key, "value": value, "expires_at": expires_at},
+            upsert=True
+        )
+
+
+class DocumentCache:
+    """
+    Two-tier cache: an in-process LRU in front of an optional Mongo tier.
+    Persistent tier errors are logged and treated as misses.
+    """
+
+    def __init__(self, name: str, max_entries: int = CACHE_MAX_ENTRIES, ttl_seconds: float = CACHE_TTL_SECONDS,
+                 persistent: bool = CACHE_PERSISTENT == '1'):
+        self.name = name
+        self.memory = LRUCache(max_entries, ttl_seconds)
+        self.persistent = None
+        self.hits = 0
+        self.misses = 0
+        if persistent:
+            # Imported lazily so servers without Mongo configured never connect
+            from .mongodb import cache_collection
+            self.persistent = MongoCacheTier(cache_collection, ttl_seconds)
+
+    async def get(self, key: str):
+        value = self.memory.get(key)
+        if value is None and self.persistent is not None:
+            try:
+                value = await asyncio.to_thread(self.persistent.get, key)
+            except Exception as e:
+                logger.error(f"{self.name} cache lookup failed: {e}")
+            if value is not None:
+                self.memory.set(key, value)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value):
+        self.memory.set(key, value)
+        if self.persistent is not None:
+            try:
+                await asyncio.to_thread(self.persistent.set, key, value)
+            except Exception as e:
+                logger.error(f"{self.name} cache write failed: {e}")
+
+    def stats(self) -> dict:
+        return {"entries": len(self.memory), "hits": self.hits, "misses": self.misses}
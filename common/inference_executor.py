@@ -0,0 +1,96 @@
+# Python Libraries
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when an inference executor cannot accept more work."""
+
+
+def summarize_waits(waits) -> dict:
+    """Average, median, 95th percentile and maximum of wait times, None without any."""
+    waits = sorted(waits)
+    if not waits:
+        return None
+    return {
+        "avg": sum(waits) / len(waits),
+        "p50": waits[len(waits) // 2],
+        "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))],
+        "max": waits[-1],
+    }
+
+
+class InferenceExecutor:
+    """
+    Thread pool for blocking model inference, so request handlers can await it
+    without freezing the event loop.
+
+    At most max_workers jobs run at once and at most max_queue jobs may wait
+    for a worker; anything beyond that is rejected with QueueFullError.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-inference")
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        # Recent queue wait times in seconds, for percentiles
+        self.waits = deque(maxlen=1000)
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on a worker thread and return its result."""
+        with self.lock:
+            if self.queued + self.running >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(f"{self.name} inference queue is full")
+            self.queued += 1
+        submitted = time.perf_counter()
+
+        def job():
+            with self.lock:
+                self.queued -= 1
+                self.running += 1
+                self.waits.append(time.perf_counter() - submitted)
+            try:
+                return fn(*args)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        future = self.executor.submit(job)
+
+        def release_cancelled(f):
+            # A job cancelled before it started never decrements the queue itself
+            if f.cancelled():
+                with self.lock:
+                    self.queued -= 1
+
+        future.add_done_callback(release_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self.lock:
+            waits = summarize_waits(self.waits)
+            stats = {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+        if waits:
+            stats["wait_seconds"] = waits
+        return stats
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,77 @@
+# Installed Libraries
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# Python Libraries
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Id of the request being handled, propagated to downstream servers in REQUEST_ID_HEADER
+request_id_var = ContextVar("request_id", default=None)
+
+STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds",
+    "Time spent in each pipeline stage",
+    ["service", "stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+PAGES = Counter("pipeline_pages_total", "Pages processed", ["service", "source"])
+TOKENS = Counter("pipeline_tokens_total", "Estimated LLM tokens", ["service", "kind"])
+ERRORS = Counter("pipeline_errors_total", "Errors per pipeline stage", ["service", "stage"])
+TEMPLATE_PAGES = Counter("pipeline_template_pages_total", "Pages of templated document types by layout alignment outcome", ["service", "outcome"])
+
+
+def get_request_id():
+    return request_id_var.get()
+
+
+def observe(service: str, stage: str, seconds: float):
+    STAGE_SECONDS.labels(service, stage).observe(seconds)
+
+
+@contextmanager
+def timed(service: str, stage: str):
+    """Record the duration of the enclosed block, and count it as an error if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        ERRORS.labels(service, stage).inc()
+        raise
+    finally:
+        observe(service, stage, time.perf_counter() - started)
+
+
+def instrument_app(app: FastAPI, service: str):
+    """
+    Add request id propagation and a Prometheus /metrics endpoint to a server.
+
+    The id is taken from the incoming REQUEST_ID_HEADER, or generated, and is
+    echoed back on the response.
+    """
+
+    @app.middleware("http")
+    async def request_id_middleware(request: Request, call_next):
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            request_id_var.reset(token)
+        # The route template keeps ids such as /jobs/{job_id} out of the labels
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        if path != "/metrics":
+            observe(service, f"http {path}", time.perf_counter() - started)
+        response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    @app.get("/metrics")
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,11 @@
+# Installed Libraries
+from pymongo import MongoClient
+
+# Internal Libraries
+from config.settings import MONGO_DB_URL, MONGO_DB_NAME
+
+# One client per process, shared by every server that uses Mongo
+client = MongoClient(MONGO_DB_URL)
+db = client[MONGO_DB_NAME]
+
+cache_collection = db["cache"]
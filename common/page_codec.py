@@ -0,0 +1,126 @@
+# Python Libraries
+import struct
+from typing import List, NamedTuple
+
+# Binary page transport for /extract-text: raw pixel buffers of one or more
+# pages with their shapes, optionally compressed with a fast lossless codec.
+# Cheaper to produce and to read than PNG, at the cost of more bytes for raw.
+#
+#   header: magic, version, codec id, page count
+#   per page: channels, width, height, payload length, payload
+#
+# Each page's pixels are compressed on their own, row-major, 8 bits per channel.
+CONTENT_TYPE = "application/x-page-frames"
+MAGIC = b"PGFR"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH")
+PAGE_HEADER = struct.Struct("<BIIQ")
+
+CODEC_IDS = {"raw": 0, "lz4": 1, "zstd": 2}
+CODEC_NAMES = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+# Preferred first when both sides support several
+CODEC_PREFERENCE = ["zstd", "lz4", "raw"]
+
+MODE_CHANNELS = {"L": 1, "RGB": 3}
+CHANNEL_MODES = {channels: mode for mode, channels in MODE_CHANNELS.items()}
+
+
+class Page(NamedTuple):
+    mode: str
+    width: int
+    height: int
+    data: bytes
+
+
+def codec_available(codec: str) -> bool:
+    # Compression libraries are optional, raw always works
+    try:
+        if codec == "lz4":
+            import lz4.frame  # noqa: F401
+        elif codec == "zstd":
+            import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return codec in CODEC_IDS
+
+
+def available_codecs() -> List[str]:
+    return [codec for codec in CODEC_PREFERENCE if codec_available(codec)]
+
+
+def compress(codec: str, data) -> bytes:
+    if codec == "raw":
+        return data
+    if codec == "lz4":
+        import lz4.frame
+        return lz4.frame.compress(data, compression_level=0)
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=1).compress(data)
+    raise ValueError(f"Unknown page codec: {codec}")
+
+
+def decompress(codec: str, data):
+    if codec == "raw":
+        return data
+    if codec == "lz4":
+        import lz4.frame
+        return lz4.frame.decompress(data)
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown page codec: {codec}")
+
+
+def is_page_frames(data: bytes) -> bool:
+    return data[:4] == MAGIC
+
+
+def encode_pages(pages: List[Page], codec: str) -> bytes:
+    """Pack pages into one buffer, compressing each page's pixels with codec."""
+    parts = [HEADER.pack(MAGIC, VERSION, CODEC_IDS[codec], len(pages))]
+    for page in pages:
+        payload = compress(codec, page.data)
+        parts.append(PAGE_HEADER.pack(MODE_CHANNELS[page.mode], page.width, page.height, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def decode_pages(data: bytes) -> List[Page]:
+    """
+    Unpack a buffer built by encode_pages. Raw pages are views into data.
+
+    Raises:
+        ValueError: If the buffer is malformed or uses an unsupported codec.
+    """
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError("Truncated page frames header")
+    magic, version, codec_id, page_count = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a page frames buffer of a supported version")
+    codec = CODEC_NAMES.get(codec_id)
+    if codec is None or not codec_available(codec):
+        raise ValueError(f"Unsupported page codec id {codec_id}")
+
+    if page_count == 0:
+        raise ValueError("No pages in page frames")
+
+    pages, offset = [], HEADER.size
+    for _ in range(page_count):
+        if offset + PAGE_HEADER.size > len(view):
+            raise ValueError("Truncated page header")
+        channels, width, height, length = PAGE_HEADER.unpack_from(view, offset)
+        offset += PAGE_HEADER.size
+        if channels not in CHANNEL_MODES or offset + length > len(view):
+            raise ValueError("Malformed page")
+        if width == 0 or height == 0:
+            raise ValueError("Page has no pixels")
+        if codec == "raw" and length != width * height * channels:
+            raise ValueError("Page size does not match its shape")
+        pixels = decompress(codec, view[offset:offset + length])
+        offset += length
+        if len(pixels) != width * height * channels:
+            raise ValueError("Page size does not match its shape")
+        pages.append(Page(CHANNEL_MODES[channels], width, height, pixels))
+    return pages
@@ -15,4 +15,120 @@ MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 OCR_SERVER_IP = os.getenv("OCR_SERVER_IP")
-LLM_SERVER_IP = os.getenv("LLM_SERVER_IP")
\ No newline at end of file
+LLM_SERVER_IP = os.getenv("LLM_SERVER_IP")
+
+# Limits on in-flight OCR page requests, per /validate request and across the server
+OCR_PAGE_CONCURRENCY = int(os.getenv("OCR_PAGE_CONCURRENCY", "4"))
+OCR_GLOBAL_CONCURRENCY = int(os.getenv("OCR_GLOBAL_CONCURRENCY", "16"))
+
+# Shared HTTP connection pool used by the poppler server for OCR/LLM calls
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# Per-backend timeouts in seconds
+OCR_CONNECT_TIMEOUT = float(os.getenv("OCR_CONNECT_TIMEOUT", "5"))
+OCR_READ_TIMEOUT = float(os.getenv("OCR_READ_TIMEOUT", "30"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "30"))
+
+# Write uploads and rendered pages under poppler/images/<request id>/ for inspection
+POPPLER_DEBUG_FILES = os.getenv("POPPLER_DEBUG_FILES", "0")
+
+# Micro-batching of concurrent /extract-text requests on the OCR server
+OCR_MAX_BATCH_SIZE = int(os.getenv("OCR_MAX_BATCH_SIZE", "4"))
+OCR_MAX_BATCH_WAIT_MS = float(os.getenv("OCR_MAX_BATCH_WAIT_MS", "20"))
+
+# Dedicated inference executors: worker threads and how many jobs may wait for one
+OCR_INFERENCE_WORKERS = int(os.getenv("OCR_INFERENCE_WORKERS", "1"))
+OCR_INFERENCE_QUEUE = int(os.getenv("OCR_INFERENCE_QUEUE", "64"))
+LLM_INFERENCE_WORKERS = int(os.getenv("LLM_INFERENCE_WORKERS", "1"))
+LLM_INFERENCE_QUEUE = int(os.getenv("LLM_INFERENCE_QUEUE", "16"))
+
+# Content-addressed cache of OCR text and LLM extractions
+CACHE_SCHEMA_VERSION = os.getenv("CACHE_SCHEMA_VERSION", "3")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+CACHE_PERSISTENT = os.getenv("CACHE_PERSISTENT", "0")
+
+# Send PDFs to the OCR server as-is (1) instead of rasterizing them in poppler (0)
+OCR_PDF_PASSTHROUGH = os.getenv("OCR_PDF_PASSTHROUGH", "1")
+
+# Derive Surya's low resolution page by downscaling the high resolution render (1) instead of rendering twice (0)
+OCR_DERIVE_LOWRES = os.getenv("OCR_DERIVE_LOWRES", "1")
+
+# Use a PDF page's embedded text instead of OCR when it has at least this many letters/digits
+OCR_TEXT_LAYER = os.getenv("OCR_TEXT_LAYER", "1")
+OCR_TEXT_LAYER_MIN_CHARS = int(os.getenv("OCR_TEXT_LAYER_MIN_CHARS", "40"))
+# A page with an image covering more than this share of it is a scan, unless its text covers at least OCR_TEXT_LAYER_MIN_COVERAGE
+OCR_TEXT_LAYER_MAX_IMAGE_SHARE = float(os.getenv("OCR_TEXT_LAYER_MAX_IMAGE_SHARE", "0.5"))
+OCR_TEXT_LAYER_MIN_COVERAGE = float(os.getenv("OCR_TEXT_LAYER_MIN_COVERAGE", "0.05"))
+
+# Recognize only the field regions of document types with a layout template, falling back to full-page OCR.
+# Off until the template boxes are validated against real scans
+OCR_ROI_TEMPLATES = os.getenv("OCR_ROI_TEMPLATES", "0")
+
+# Rule-based fields at or above this confidence are not sent to the LLM
+RULES_MIN_CONFIDENCE = float(os.getenv("RULES_MIN_CONFIDENCE", "0.8"))
+
+# Keyword classifier that rejects wrong document types before the LLM
+CLASSIFIER_ENABLED = os.getenv("CLASSIFIER_ENABLED", "1")
+CLASSIFIER_MIN_CONFIDENCE = float(os.getenv("CLASSIFIER_MIN_CONFIDENCE", "0.75"))
+CLASSIFIER_MIN_SCORE = float(os.getenv("CLASSIFIER_MIN_SCORE", "4"))
+
+# Asynchronous validation jobs stored in applications_collection
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "0")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "900"))
+# Hosts a job's callback_url may point to, comma separated; empty disables callbacks
+JOB_CALLBACK_HOSTS = [host.strip().lower() for host in os.getenv("JOB_CALLBACK_HOSTS", "").split(",") if host.strip()]
+
+# Schema-aware OCR text compaction and per-document-type prompts on the LLM server
+LLM_COMPACTION = os.getenv("LLM_COMPACTION", "1")
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "1500"))
+
+# LLM model cascade: models tried in order, escalating when the output fails schema validation
+LLM_BACKEND = os.getenv("LLM_BACKEND", "ollama")
+LLM_CASCADE_MODELS = [model.strip() for model in os.getenv("LLM_CASCADE_MODELS", "gemma3:12b").split(",") if model.strip()]
+LLM_CASCADE_MAX_EMPTY_FRACTION = float(os.getenv("LLM_CASCADE_MAX_EMPTY_FRACTION", "0.5"))
+LLM_FAKE_RESPONSE = os.getenv("LLM_FAKE_RESPONSE", "['other']")
+
+# OCR and LLM replicas as comma separated host:port lists, load balanced by the poppler server
+OCR_SERVERS = [server.strip() for server in os.getenv("OCR_SERVERS", f"{OCR_SERVER_IP}:8001").split(",") if server.strip()]
+LLM_SERVERS = [server.strip() for server in os.getenv("LLM_SERVERS", f"{LLM_SERVER_IP}:8002").split(",") if server.strip()]
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+BACKEND_EJECT_AFTER_FAILURES = int(os.getenv("BACKEND_EJECT_AFTER_FAILURES", "3"))
+# Send a backup request once a request is slower than this percentile of recent latencies of its kind, 0 disables.
+# Off for the LLM: Ollama keeps generating after the losing copy disconnects, so each hedge costs a full generation
+OCR_HEDGE_PERCENTILE = float(os.getenv("OCR_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+# Streaming rasterization in poppler: pages rendered per pdftoppm call, and rendered pages
+# allowed to wait for OCR at once
+POPPLER_RENDER_WINDOW = int(os.getenv("POPPLER_RENDER_WINDOW", "2"))
+POPPLER_MAX_RESIDENT_PAGES = int(os.getenv("POPPLER_MAX_RESIDENT_PAGES", "4"))
+
+# Pages read per document type as comma separated type:first-last ranges, other types are read in full
+def parse_page_ranges(value: str) -> dict:
+    ranges = {}
+    for entry in filter(None, (entry.strip() for entry in value.split(","))):
+        document_type, _, pages = entry.partition(":")
+        first, _, last = pages.partition("-")
+        ranges[document_type.strip()] = (int(first), int(last or first))
+    return ranges
+
+DOCUMENT_PAGE_RANGES = parse_page_ranges(os.getenv("DOCUMENT_PAGE_RANGES", "aadhaar:1-2"))
+
+# Worker processes for rasterization and image preprocessing in poppler, 0 means one per core
+POPPLER_PROCESS_POOL = os.getenv("POPPLER_PROCESS_POOL", "1")
+POPPLER_PROCESS_WORKERS = int(os.getenv("POPPLER_PROCESS_WORKERS", "0"))
+
+# Clean up page images in poppler before OCR: grayscale, deskew, border crop, per document type downscaling
+POPPLER_PREPROCESS = os.getenv("POPPLER_PREPROCESS", "1")
+
+# How poppler sends rendered pages to OCR: "png", a page frames codec ("raw", "lz4", "zstd"),
+# or "auto" for the best compressed codec every OCR replica supports
+POPPLER_PAGE_TRANSPORT = os.getenv("POPPLER_PAGE_TRANSPORT", "auto")
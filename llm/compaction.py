@@ -0,0 +1,114 @@
+# Python Libraries
+import re
+
+# Lines that never carry a schema value
+BOILERPLATE = re.compile(
+    r"^(page\s*\d+(\s*of\s*\d+)?|\d+\s*/\s*\d+)$"
+    r"|computer\s*generated|does\s*not\s*require\s*(a\s*)?signature|signature\s*of"
+    r"|https?://|www\.|e-?mail\s*:|helpline|toll\s*free|disclaimer|^note\s*:"
+    r"|scan\s*(the\s*)?qr|print\s*date|downloaded\s*(on|date)",
+    re.I,
+)
+
+NUMBER_TOKEN = re.compile(r"^[\d.,:/%()-]+$")
+
+# Extra words that point at a schema key besides the key's own words
+KEY_SYNONYMS = {
+    "date_of_birth": ["dob", "birth"],
+    "aadhaar_number": ["aadhaar", "aadhar", "uid"],
+    "father_name": ["father", "s/o"],
+    "mother_name": ["mother"],
+    "registration_number": ["registration", "reg"],
+    "all_india_rank_in_this_paper": ["rank", "air"],
+    "gate_score": ["score"],
+    "marks_out_of_100": ["marks"],
+    "roll_number": ["roll"],
+    "cgpa": ["cgpa", "gpa"],
+    "percentage": ["percentage", "%"],
+    "passing_year": ["passing", "passed", "year"],
+    "address": ["address", "c/o", "pin"],
+    "gender": ["male", "female", "gender", "sex"],
+    "category": ["category", "caste", "community"],
+    "from_date": ["joining", "joined", "since"],
+    "to_date": ["relieving", "relieved", "till"],
+}
+
+# Too common to mark a line as relevant on their own
+STOP_WORDS = {"of", "in", "this", "the", "number", "no", "date", "out", "to", "from"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, about four characters per token for gemma's tokenizer on OCR text."""
+    return (len(text) + 3) // 4
+
+
+def key_terms(schema: dict) -> set:
+    terms = set()
+    for key in schema:
+        terms.update(word for word in key.lower().split("_") if word not in STOP_WORDS)
+        terms.update(KEY_SYNONYMS.get(key, []))
+    return terms
+
+
+def normalize_line(line: str) -> str:
+    return re.sub(r"\s+", " ", line).strip().lower()
+
+
+def is_numeric_row(line: str) -> bool:
+    """Table rows made mostly of numbers, e.g. per-subject marks."""
+    tokens = line.split()
+    if len(tokens) < 4:
+        return False
+    return sum(bool(NUMBER_TOKEN.match(token)) for token in tokens) / len(tokens) >= 0.6
+
+
+def mentions(line: str, terms: set) -> bool:
+    words = set(re.findall(r"[\w/%]+", line.lower()))
+    return bool(words & terms)
+
+
+def compact_text(raw_text: str, schema: dict, token_budget: int):
+    """
+    Shrink OCR text to what the schema needs before it goes into the prompt.
+
+    Drops boilerplate lines, repeated lines such as per-page headers and
+    footers, and numeric table rows that do not mention a schema key. If the
+    rest is still over token_budget, lines mentioning a schema key (and their
+    neighbours) are kept first, then the remaining lines in reading order.
+
+    Returns:
+        tuple: (compacted text, number of lines dropped).
+    """
+    terms = key_terms(schema)
+    lines, seen = [], set()
+    for line in raw_text.splitlines():
+        line = line.strip()
+        normalized = normalize_line(line)
+        if not normalized or normalized in seen or BOILERPLATE.search(normalized):
+            continue
+        seen.add(normalized)
+        lines.append(line)
+
+    relevant = [mentions(line, terms) for line in lines]
+    kept = []
+    for i, line in enumerate(lines):
+        # A value often sits on the line after its label
+        near_key = relevant[i] or (i > 0 and relevant[i - 1])
+        if is_numeric_row(line) and not near_key:
+            continue
+        kept.append((i, line, near_key))
+
+    total = sum(estimate_tokens(line) + 1 for _, line, _ in kept)
+    if total > token_budget:
+        selected, used = set(), 0
+        # Key-adjacent lines first, then everything else, each in reading order
+        for i, line, near_key in sorted(kept, key=lambda item: not item[2]):
+            cost = estimate_tokens(line) + 1
+            if used + cost > token_budget:
+                continue
+            selected.add(i)
+            used += cost
+        kept = [item for item in kept if item[0] in selected]
+
+    compacted = "\n".join(line for _, line, _ in kept)
+    return compacted, len(raw_text.splitlines()) - len(kept)
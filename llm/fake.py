@@ -0,0 +1,25 @@
+# Python Libraries
+import time
+
+
+class FakeLLM:
+    """
+    Drop-in stand-in for OllamaLLM that streams a canned answer, for tests and
+    benchmarks on machines without Ollama.
+
+    response may be a string or a callable taking the prompt and returning one.
+    """
+
+    def __init__(self, model: str, response="['other']", chunk_size: int = 8, delay: float = 0.0):
+        self.model = model
+        self.response = response
+        self.chunk_size = chunk_size
+        # Seconds to sleep per chunk, to mimic generation speed
+        self.delay = delay
+
+    def stream(self, prompt: str):
+        text = self.response(prompt) if callable(self.response) else self.response
+        for i in range(0, len(text), self.chunk_size):
+            if self.delay:
+                time.sleep(self.delay)
+            yield text[i:i + self.chunk_size]
@@ -1,7 +1,30 @@
 # Installed Libraries
+import json
 import logging
 import torch
-from langchain_ollama import OllamaLLM
+
+# Internal Libraries
+from common.inference_executor import InferenceExecutor, QueueFullError
+from common.cache import DocumentCache, make_cache_key
+from .stream_parser import ArrayStreamParser
+from .compaction import compact_text, estimate_tokens
+from .prompts import build_type_prompt
+from .validation import validate_output
+from .fake import FakeLLM
+from common.metrics import timed, observe, TOKENS
+from config.settings import (
+    LLM_INFERENCE_WORKERS,
+    LLM_INFERENCE_QUEUE,
+    LLM_COMPACTION,
+    LLM_PROMPT_TOKEN_BUDGET,
+    LLM_BACKEND,
+    LLM_CASCADE_MODELS,
+    LLM_CASCADE_MAX_EMPTY_FRACTION,
+    LLM_FAKE_RESPONSE,
+)
+
+# Python Libraries
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -9,13 +32,57 @@ logger = logging.getLogger(__name__)
 
 llm = None
 
-def load_llm_once():
-    global llm
+# Cascade tiers as (model name, model), smallest first
+models = []
+
+# Per-tier attempts, accepted answers and generation time
+cascade_stats = {}
+
+# Generation is blocking, so it runs here instead of on the event loop
+inference_executor = InferenceExecutor("llm", LLM_INFERENCE_WORKERS, LLM_INFERENCE_QUEUE)
+
+# Extractions keyed by OCR text and schema, so re-uploaded documents skip generation
+llm_cache = DocumentCache("llm")
+
+# Settings that change the generated answer, so cached answers of other settings are not reused
+OUTPUT_SETTINGS = [LLM_BACKEND, ",".join(LLM_CASCADE_MODELS), LLM_COMPACTION, str(LLM_PROMPT_TOKEN_BUDGET)]
+
+def default_model_factory(model_name):
+    if LLM_BACKEND == "fake":
+        return FakeLLM(model_name, response=LLM_FAKE_RESPONSE)
+    # Imported here so the fake backend runs without langchain installed
+    from langchain_ollama import OllamaLLM
+    return OllamaLLM(model=model_name, temperature=0)
+
+def load_llm_once(model_factory=None, model_names=None):
+    """
+    Load every model of the cascade.
+
+    Args:
+        model_factory (callable): Builds a model from its name, defaults to
+            Ollama (or FakeLLM when LLM_BACKEND=fake). Tests can pass their own.
+        model_names (list): Cascade tiers, smallest first. Defaults to LLM_CASCADE_MODELS.
+    """
+    global llm, models
+    model_factory = model_factory or default_model_factory
     try:
-        llm = OllamaLLM(model="gemma3:12b", temperature=0)
+        models = [(name, model_factory(name)) for name in (model_names or LLM_CASCADE_MODELS)]
     except Exception as e:
         logger.error(f"Failed to load the model: {e}")
         raise
+    llm = models[-1][1]
+    cascade_stats.clear()
+    for name, _ in models:
+        cascade_stats[name] = {"attempts": 0, "accepted": 0, "errors": 0, "total_seconds": 0.0}
+
+def get_cascade_stats() -> dict:
+    stats = {}
+    for name, tier in cascade_stats.items():
+        stats[name] = dict(tier)
+        if tier["attempts"]:
+            stats[name]["hit_rate"] = tier["accepted"] / tier["attempts"]
+            stats[name]["avg_seconds"] = tier["total_seconds"] / tier["attempts"]
+    return stats
 
 # Define the prompt template for JSON validation
 template = """
@@ -110,21 +177,150 @@ def compare_values(extracted_values_string, runtime_values):
 
     return results
 
-async def extract_entity(json_input, raw_text):
-    torch.cuda.empty_cache()
-    # Format the prompt with the input data
+def generate(formatted_prompt, expected_document_type=None, model=None):
+    """
+    Stream a completion from the loaded model. Blocking, run it on the inference executor.
+
+    Generation stops as soon as the top-level array closes. If expected_document_type
+    is given, it also stops once the first element is known and does not match it.
+
+    Args:
+        formatted_prompt (str): The complete prompt.
+        expected_document_type (str): Document type the caller expects, optional.
+        model: Model to generate with, defaults to the last cascade tier.
+
+    Returns:
+        str: The generated array.
+    """
+    logger.info("Started streaming...")
+    started = time.perf_counter()
+    result = (model or llm).stream(formatted_prompt)
+    parser = ArrayStreamParser()
+    checked_document_type = expected_document_type is None
+    first_chunk = True
+    parse_seconds = 0.0
+
+    try:
+        # Collect the streamed chunks into the final answer
+        for chunk in result:
+            if first_chunk:
+                first_chunk = False
+                observe("llm", "llm_ttft", time.perf_counter() - started)
+            parse_started = time.perf_counter()
+            parser.feed(chunk)
+            parse_seconds += time.perf_counter() - parse_started
+            logger.info(parser.text)
+
+            if not checked_document_type and parser.first_element_complete:
+                checked_document_type = True
+                document_type = parser.first_element()
+                # Compared exactly, as poppler compares it
+                if document_type != expected_document_type:
+                    logger.info(f"Document type {document_type!r} does not match {expected_document_type!r}, stopping generation")
+                    return parser.first_element_array_text()
+
+            if parser.closed:
+                return parser.array_text()
+    finally:
+        # Closing the stream drops the connection, which stops Ollama generating
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+        observe("llm", "llm_generation", time.perf_counter() - started)
+        observe("llm", "parse", parse_seconds)
+        TOKENS.labels("llm", "generated").inc(estimate_tokens(parser.text))
+
+    # The model stopped without closing the array, hand back what it produced
+    return parser.text
+
+def build_prompt(json_input, raw_text, document_type=None):
+    """
+    Build the extraction prompt. With compaction enabled and a known document
+    type, the OCR text is compacted and only that type's rules are included;
+    otherwise the generic template is used.
+
+    Returns:
+        tuple: (prompt, tokens saved compared to the generic prompt on the full text).
+    """
     array_schema = [f"Obtained {key} here" for key in json_input.keys()]
-    formatted_prompt = template.format(json_input, raw_text, ["Obtained document_type here"] + array_schema)
+    output_format = ["Obtained document_type here"] + array_schema
+    full_prompt = template.format(json_input, raw_text, output_format)
+    if LLM_COMPACTION != '1' or not document_type:
+        return full_prompt, 0
 
-    print("Started streaming...")
-    result = llm.stream(formatted_prompt)
+    compacted_text, dropped_lines = compact_text(raw_text, json_input, LLM_PROMPT_TOKEN_BUDGET)
+    prompt = build_type_prompt(document_type, json_input, compacted_text, output_format)
+    tokens_saved = estimate_tokens(full_prompt) - estimate_tokens(prompt)
+    logger.info(f"Compacted prompt: dropped {dropped_lines} OCR line(s), saved ~{tokens_saved} token(s)")
+    return prompt, tokens_saved
 
-    ans = ""
+async def run_cascade(formatted_prompt, json_input, document_type=None):
+    """
+    Try each model tier in order and return the first answer that passes schema
+    validation. A tier that fails, e.g. a model that was never pulled, also
+    escalates. The last tier's answer, or error, is returned as-is.
 
-    # Stream the result and yield each chunk to the caller
-    for chunk in result:
-        ans += chunk
-        # yield chunk
-        logger.info(ans)
-    
-    return ans
\ No newline at end of file
+    Returns:
+        tuple: (generated array, name of the model that produced it, whether it passed validation).
+    """
+    for tier, (model_name, model) in enumerate(models):
+        last_tier = tier == len(models) - 1
+        started = time.perf_counter()
+        stats = cascade_stats[model_name]
+        stats["attempts"] += 1
+        try:
+            ans = await inference_executor.run(generate, formatted_prompt, document_type, model)
+        except QueueFullError:
+            # Every tier shares the executor, the next one would be rejected too
+            raise
+        except Exception as e:
+            stats["errors"] += 1
+            if last_tier:
+                raise
+            logger.error(f"Escalating from {model_name} after an error: {e}")
+            continue
+        finally:
+            stats["total_seconds"] += time.perf_counter() - started
+
+        problems = validate_output(ans, json_input, LLM_CASCADE_MAX_EMPTY_FRACTION, document_type)
+        if last_tier:
+            stats["accepted"] += 1
+            return ans, model_name, not problems
+        if not problems:
+            stats["accepted"] += 1
+            return ans, model_name, True
+        logger.info(f"Escalating from {model_name}: {'; '.join(problems)}")
+
+async def extract_entity(json_input, raw_text, document_type=None):
+    """
+    Extract the schema values from OCR text.
+
+    Returns:
+        dict: "result" is the generated array, "prompt_tokens" and
+        "prompt_tokens_saved" are estimates for the prompt that was sent.
+    """
+    # The OCR text is a deterministic function of the document bytes
+    cache_key = make_cache_key("llm", document_type, json.dumps(json_input, sort_keys=True), raw_text, *OUTPUT_SETTINGS)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        logger.info("LLM cache hit")
+        return cached
+
+    torch.cuda.empty_cache()
+    # Format the prompt with the input data
+    with timed("llm", "prompt_build"):
+        formatted_prompt, tokens_saved = build_prompt(json_input, raw_text, document_type)
+    TOKENS.labels("llm", "prompt").inc(estimate_tokens(formatted_prompt))
+    TOKENS.labels("llm", "prompt_saved").inc(tokens_saved)
+
+    ans, model_name, valid = await run_cascade(formatted_prompt, json_input, document_type)
+    response = {
+        "result": ans,
+        "model": model_name,
+        "prompt_tokens": estimate_tokens(formatted_prompt),
+        "prompt_tokens_saved": tokens_saved,
+    }
+    # Answers that failed validation or never closed their array are not replayed on a retry
+    if valid:
+        await llm_cache.set(cache_key, response)
+    return response
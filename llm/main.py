@@ -2,11 +2,14 @@
 import uvicorn
 import torch
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 
 # Internal Libraries
-from .gemma import extract_entity, load_llm_once, logger
+from .gemma import extract_entity, load_llm_once, inference_executor, llm_cache, get_cascade_stats, logger
+from common.inference_executor import QueueFullError
+from common.metrics import instrument_app, get_request_id
 from config.settings import IS_CUDA_CHECK_NEEDED, CUDA_CONFIGURED
 
 # Python Libraries
@@ -24,34 +27,47 @@ if IS_CUDA_CHECK_NEEDED=='1':
 
 load_llm_once()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    inference_executor.shutdown()
 
-request_id = 1
+app = FastAPI(lifespan=lifespan)
+instrument_app(app, "llm")
 
 @app.post("/process-data")
 async def process_data(request: Request):
-    global request_id
-    request_id += 1
-
     try:
         data = await request.json()
         schema = data.get("schema")
         raw_text = data.get("raw_text")
+        document_type = data.get("document_type")
 
         # Check if schema is a valid JSON
         if not isinstance(schema, dict):
             raise ValueError("Invalid schema format")
         
-        logger.info(f"Request received {request_id}")
-        result = await extract_entity(schema, raw_text)
-        return JSONResponse(content={'result': result})
+        logger.info(f"Request received {get_request_id()}")
+        result = await extract_entity(schema, raw_text, document_type)
+        return JSONResponse(content=result)
 
     except ValueError as e:
         logger.error(f"ValueError: {e}")
         raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="LLM server is busy, retry later.")
     except Exception as e:
         logger.exception("An error occurred while processing the request.")
         raise HTTPException(status_code=500, detail="An internal server error occurred.")
 
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+@app.get("/inference-stats")
+async def inference_stats():
+    return {**inference_executor.stats(), "cache": llm_cache.stats(), "cascade": get_cascade_stats()}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8002)
\ No newline at end of file
@@ -0,0 +1,77 @@
+# Document types the model may answer with at index 0
+DOCUMENT_TYPES = [
+    "marksheet", "community", "birth_cert", "bonafide", "gate_score_card", "degree_cert",
+    "person_with_disability", "aadhaar", "community_cert", "proof_of_address", "proof_of_class",
+    "provisional_cert", "experience_cert", "proof_of_category", "phd_cert", "other",
+]
+
+# Instructions shared by every document type, a condensed form of gemma.template
+BASE_RULES = [
+    "Extract the value of each JSON key from the raw text. Try variations of the key (case, abbreviations, nearby labels).",
+    "Convert values to the declared type.",
+    "If a field is not in English, translate it to English. Translations must be accurate.",
+    "If a value is not found, output '' for that index.",
+]
+
+TRANSLATION_TYPES = {"aadhaar", "birth_cert", "community_cert", "proof_of_category", "proof_of_address"}
+
+# Rules that only matter for one document type
+TYPE_RULES = {
+    "aadhaar": [
+        "aadhaar_number is the 12 digit number printed in groups of four; output the digits without spaces. Ignore the 16 digit VID.",
+        "gender is one of Male, Female, Other.",
+    ],
+    "marksheet": [
+        "If there are several totals, use the grand total. If no grand total is printed, output the sum of the subject totals.",
+        "If a score appears more than once, output all of them as an array.",
+    ],
+    "gate_score_card": [
+        "all_india_rank_in_this_paper, gate_score and year are integers; marks_out_of_100 is a number.",
+        "registration_number is the candidate's GATE registration number, letters and digits.",
+    ],
+    "degree_cert": [
+        "cgpa and percentage are numbers; output '' for whichever is not printed.",
+    ],
+    "experience_cert": [
+        "Output dates as YYYY-MM-DD.",
+    ],
+    "phd_cert": [
+        "Date_of_reg is the date of PhD registration, as YYYY-MM-DD.",
+    ],
+}
+
+TYPE_PROMPT = """Extract entities from the raw text of a document.
+
+Rules:
+{rules}
+
+JSON Input: {schema}
+
+Raw Text:
+{raw_text}
+
+Output only a Python array, starting with '[' and ending with ']', with no other text.
+Index 0 is the document type, one of: {document_types}.
+The remaining indices are the values for the JSON keys, in the same order:
+{output_format}
+"""
+
+
+def build_type_prompt(document_type: str, schema: dict, raw_text: str, output_format: list) -> str:
+    """
+    Build a prompt carrying only the rules of one document type. The type only
+    picks the rules and is not named, so the model identifies the document
+    itself and wrong uploads still show up at index 0.
+    """
+    rules = list(BASE_RULES)
+    if document_type not in TRANSLATION_TYPES:
+        # Only the translation-prone types need the translation rule
+        rules.remove(BASE_RULES[2])
+    rules += TYPE_RULES.get(document_type, [])
+    return TYPE_PROMPT.format(
+        rules="\n".join(f"- {rule}" for rule in rules),
+        schema=schema,
+        raw_text=raw_text,
+        document_types=", ".join(DOCUMENT_TYPES),
+        output_format=output_format,
+    )
@@ -0,0 +1,79 @@
+# Python Libraries
+import ast
+
+
+class ArrayStreamParser:
+    """
+    Incrementally scans a streamed array literal such as ['aadhaar', 'John', '']
+    so generation can stop as soon as enough of it is known.
+
+    Text before the opening '[' (for example a ``` fence) is ignored, and
+    brackets and commas inside quoted strings do not count.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.start = None
+        self.first_element_end = None
+        self.end = None
+        self.depth = 0
+        self.quote = None
+        self.escaped = False
+
+    def feed(self, chunk: str):
+        offset = len(self.text)
+        self.text += chunk
+        if self.end is not None:
+            return
+
+        for i, ch in enumerate(chunk, start=offset):
+            if self.start is None:
+                if ch == "[":
+                    self.start = i
+                    self.depth = 1
+                continue
+
+            if self.quote:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == self.quote:
+                    self.quote = None
+            elif ch in "\"'":
+                self.quote = ch
+            elif ch in "[{(":
+                self.depth += 1
+            elif ch in "]})":
+                self.depth -= 1
+                if self.depth == 0:
+                    if self.first_element_end is None:
+                        self.first_element_end = i
+                    self.end = i + 1
+                    return
+            elif ch == "," and self.depth == 1 and self.first_element_end is None:
+                self.first_element_end = i
+
+    @property
+    def closed(self) -> bool:
+        """True once the top-level array has been closed."""
+        return self.end is not None
+
+    @property
+    def first_element_complete(self) -> bool:
+        return self.first_element_end is not None
+
+    def first_element(self):
+        """The first array element, or None if it is not a literal."""
+        try:
+            return ast.literal_eval(self.text[self.start + 1:self.first_element_end].strip())
+        except (ValueError, SyntaxError):
+            return None
+
+    def array_text(self) -> str:
+        """The complete top-level array, without any surrounding text."""
+        return self.text[self.start:self.end]
+
+    def first_element_array_text(self) -> str:
+        """An array holding only the first element, for early rejections."""
+        return self.text[self.start:self.first_element_end] + "]"
@@ -0,0 +1,92 @@
+# Python Libraries
+import ast
+import re
+
+INTEGER = re.compile(r"^-?\d+$")
+FLOAT = re.compile(r"^-?\d+(\.\d+)?$")
+RANGE = re.compile(r"(-?\d+(?:\.\d+)?)\s*to\s*(-?\d+(?:\.\d+)?)")
+DIGITS = re.compile(r"(\d+)\s*digit")
+
+DATE_FORMATS = {
+    "DD-MM-YYYY": re.compile(r"^(0?[1-9]|[12]\d|3[01])[-/.](0?[1-9]|1[0-2])[-/.](\d{4})$"),
+    "YYYY-MM-DD": re.compile(r"^(\d{4})[-/.](0?[1-9]|1[0-2])[-/.](0?[1-9]|[12]\d|3[01])$"),
+}
+
+
+def check_value(value, declared_type: str):
+    """
+    Check one extracted value against its schema declaration, e.g.
+    "Integer, format: 12 digit number" or "Float, 0.0 to 100.0".
+
+    Returns:
+        str: A description of the problem, or None if the value fits.
+    """
+    if value in ("", None):
+        return None
+    if isinstance(value, list):
+        # Repeated scores are returned as arrays
+        problems = [check_value(item, declared_type) for item in value]
+        return next((problem for problem in problems if problem), None)
+
+    text = str(value).strip()
+    declared = declared_type.lower()
+
+    for date_format, pattern in DATE_FORMATS.items():
+        if date_format.lower() in declared:
+            return None if pattern.match(text) else f"expected a {date_format} date"
+
+    if "|" in declared_type and " " not in declared_type.strip():
+        options = [option.lower() for option in declared_type.split("|")]
+        return None if text.lower() in options else f"expected one of {declared_type}"
+
+    number = None
+    if declared.startswith("integer"):
+        compact = text.replace(" ", "")
+        if not INTEGER.match(compact):
+            return "expected an integer"
+        digits = DIGITS.search(declared)
+        if digits and len(compact) != int(digits.group(1)):
+            return f"expected {digits.group(1)} digits"
+        if "yyyy" in declared and len(compact) != 4:
+            return "expected a 4 digit year"
+        number = int(compact)
+    elif declared.startswith("float"):
+        if not FLOAT.match(text):
+            return "expected a number"
+        number = float(text)
+
+    bounds = RANGE.search(declared)
+    if number is not None and bounds and not float(bounds.group(1)) <= number <= float(bounds.group(2)):
+        return f"expected a value from {bounds.group(1)} to {bounds.group(2)}"
+    return None
+
+
+def validate_output(output: str, schema: dict, max_empty_fraction: float, document_type: str = None) -> list:
+    """
+    Validate a generated array against the schema's declared types and, if
+    given, the expected document type at index 0.
+
+    Returns:
+        list: Problems found, empty when the output can be accepted.
+    """
+    try:
+        values = ast.literal_eval(output.strip())
+    except (ValueError, SyntaxError):
+        return ["output is not an array literal"]
+    if not isinstance(values, list):
+        return ["output is not an array"]
+    if len(values) != len(schema) + 1:
+        return [f"expected {len(schema) + 1} values, got {len(values)}"]
+
+    problems = []
+    if document_type and values[0] != document_type:
+        problems.append(f"document type {values[0]!r} is not {document_type!r}")
+    for (key, declared_type), value in zip(schema.items(), values[1:]):
+        problem = check_value(value, declared_type)
+        if problem:
+            problems.append(f"{key}: {problem}")
+
+    empty = sum(value in ("", None) for value in values[1:])
+    if schema and empty / len(schema) > max_empty_fraction:
+        problems.append(f"{empty} of {len(schema)} values are empty")
+    return problems
@@ -0,0 +1,144 @@
+# Installed Libraries
+from PIL import Image
+
+# Internal Libraries
+from .extract import recognize_images, logger
+from common.inference_executor import InferenceExecutor, QueueFullError, summarize_waits
+
+# Python Libraries
+import asyncio
+import time
+from collections import deque
+from typing import List, Optional
+
+
+def fail(items: list, error: Exception):
+    """Fail the futures of queued pages that will not be recognized."""
+    for _, _, future, _, _ in items:
+        if not future.done():
+            future.set_exception(error)
+
+
+class OCRBatcher:
+    """
+    Collects page images from concurrent requests and runs them through Surya
+    in shared batches, routing each page's text back to its caller.
+
+    A batch is flushed once it holds max_batch_size pages or max_wait_ms has
+    passed since its first page arrived, whichever comes first. Batches run on
+    the inference executor, one per free worker; while every worker is busy,
+    pages keep accumulating so the next batch is fuller. At most max_queue
+    pages may wait, further pages are rejected with QueueFullError.
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_batch_size: int, max_wait_ms: float, max_queue: int):
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.queue = None
+        self.task = None
+        self.workers = None
+        # Running batches, referenced so they are not garbage collected mid-run
+        self.batch_tasks = set()
+        # Recent time pages spent queued before their batch started, in seconds
+        self.waits = deque(maxlen=1000)
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.workers = asyncio.Semaphore(self.executor.max_workers)
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+        # Pages still queued will never run, their callers must not wait forever
+        while self.queue is not None and not self.queue.empty():
+            fail([self.queue.get_nowait()], RuntimeError("OCR batcher stopped"))
+
+    async def submit(self, image: Image.Image, highres_image: Image.Image = None, document_type: Optional[str] = None) -> str:
+        """Queue one page and wait for its recognized text."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((image, highres_image or image, future, time.perf_counter(), document_type))
+        except asyncio.QueueFull:
+            raise QueueFullError("OCR page queue is full")
+        return await future
+
+    async def submit_many(self, images: List[Image.Image], highres_images: List[Image.Image],
+                          document_type: Optional[str] = None) -> List[str]:
+        """Queue several pages of one document and return their texts in order."""
+        return await asyncio.gather(*(self.submit(image, high, document_type) for image, high in zip(images, highres_images)))
+
+    def stats(self) -> dict:
+        waits = summarize_waits(self.waits)
+        stats = {"queued_pages": self.queue.qsize() if self.queue else 0}
+        if waits:
+            stats["page_wait_seconds"] = waits
+        return stats
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        try:
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            fail(batch, RuntimeError("OCR batcher stopped"))
+            raise
+
+        # Callers that disconnected while waiting do not need inference
+        return [item for item in batch if not item[2].done()]
+
+    async def _run(self):
+        while True:
+            # Only start collecting once a worker can take the batch
+            await self.workers.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self.workers.release()
+                raise
+            if not batch:
+                self.workers.release()
+                continue
+            task = asyncio.create_task(self._run_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def _run_batch(self, batch: list):
+        try:
+            started = time.perf_counter()
+            self.waits.extend(started - queued_at for _, _, _, queued_at, _ in batch)
+
+            images = [image for image, _, _, _, _ in batch]
+            highres_images = [high for _, high, _, _, _ in batch]
+            document_types = [document_type for _, _, _, _, document_type in batch]
+            logger.info(f"Running OCR batch of {len(batch)} page(s)")
+
+            try:
+                texts = await self.executor.run(recognize_images, images, highres_images, document_types)
+            except Exception as e:
+                logger.exception("OCR batch failed")
+                fail(batch, e)
+                return
+
+            for (_, _, future, _, _), text in zip(batch, texts):
+                if not future.done():
+                    future.set_result(text)
+        finally:
+            self.workers.release()
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
-import io
-from typing import List
+import threading
+from typing import List, Optional
 from PIL import Image
 
 import torch
 import pypdfium2
+import pypdfium2.raw as pdfium_c
 
 import logging
 
@@ -12,6 +13,16 @@ from surya.models import load_predictors
 from surya.recognition.languages import replace_lang_with_code
 from surya.settings import settings
 
+from config.settings import (
+    OCR_DERIVE_LOWRES,
+    OCR_TEXT_LAYER_MIN_CHARS,
+    OCR_TEXT_LAYER_MAX_IMAGE_SHARE,
+    OCR_TEXT_LAYER_MIN_COVERAGE,
+    OCR_ROI_TEMPLATES,
+)
+from common.metrics import timed, TEMPLATE_PAGES
+from .templates import get_template, align, box_polygon, read_regions
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -21,20 +32,199 @@ def load_model_once():
     predictors = load_predictors()
 
 
-def open_pdf(stream: io.BytesIO) -> pypdfium2.PdfDocument:
-    return pypdfium2.PdfDocument(stream)
+# pdfium is not thread-safe, so every call into it is serialized
+pdfium_lock = threading.Lock()
+
+
+def is_pdf(data: bytes) -> bool:
+    return data[:5] == b"%PDF-"
+
+
+class PdfPageRenderer:
+    """
+    Opens a PDF once and renders its pages on demand, so only the pages of the
+    batch being processed are held in memory.
+    """
+
+    def __init__(self, data: bytes):
+        with pdfium_lock:
+            self.doc = pypdfium2.PdfDocument(data)
+            self.page_count = len(self.doc)
+
+    def __len__(self):
+        return self.page_count
+
+    def render(self, index: int, dpi: int) -> Image.Image:
+        with pdfium_lock:
+            page = self.doc[index]
+            try:
+                return page.render(scale=dpi / 72).to_pil().convert("RGB")
+            finally:
+                page.close()
+
+    def render_pair(self, index: int):
+        """Render one page at Surya's detection and recognition resolutions."""
+        highres = self.render(index, settings.IMAGE_DPI_HIGHRES)
+        if OCR_DERIVE_LOWRES != '1':
+            return self.render(index, settings.IMAGE_DPI), highres
+        scale = settings.IMAGE_DPI / settings.IMAGE_DPI_HIGHRES
+        size = (max(1, round(highres.width * scale)), max(1, round(highres.height * scale)))
+        return highres.resize(size, Image.LANCZOS), highres
+
+    def render_pages(self, indices: List[int]):
+        """
+        Render the given pages.
+
+        Returns:
+            tuple: (low resolution page images, high resolution page images), in the order of indices.
+        """
+        with timed("ocr", "pdf_render"):
+            pairs = [self.render_pair(i) for i in indices]
+        return [low for low, _ in pairs], [high for _, high in pairs]
+
+    def text_layer(self, index: int):
+        """
+        Return the page's embedded text if it is usable in place of OCR.
+
+        Scanned pages have no text layer, or only a small one such as a
+        digital signature stamp or a scanner footer over a full-page image.
+        The text layer is only trusted if no image covers a large part of the
+        page, or if the text itself covers enough of it.
+
+        Returns:
+            tuple: (text or None, reason for the decision).
+        """
+        with pdfium_lock:
+            page = self.doc[index]
+            try:
+                width, height = page.get_size()
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range()
+                    text_area = sum(
+                        (right - left) * (top - bottom)
+                        for left, bottom, right, top in (textpage.get_rect(i) for i in range(textpage.count_rects()))
+                    )
+                finally:
+                    textpage.close()
+                image_area = max((
+                    (right - left) * (top - bottom)
+                    for left, bottom, right, top in (obj.get_pos() for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]))
+                ), default=0)
+            finally:
+                page.close()
+
+        text = "\n".join(line.strip() for line in text.splitlines() if line.strip())
+        meaningful = sum(ch.isalnum() for ch in text)
+        if meaningful < OCR_TEXT_LAYER_MIN_CHARS:
+            return None, "too_little_text"
+        # Broken font encodings come out as replacement characters
+        if text.count("\ufffd") > meaningful * 0.1:
+            return None, "broken_text_layer"
+        page_area = max(width * height, 1)
+        if image_area / page_area > OCR_TEXT_LAYER_MAX_IMAGE_SHARE and text_area / page_area < OCR_TEXT_LAYER_MIN_COVERAGE:
+            return None, "scanned_image"
+        return text, "text_layer"
+
+    def close(self):
+        with pdfium_lock:
+            self.doc.close()
+
+
+def recognition_langs() -> list:
+    langs = ["en"]
+    replace_lang_with_code(langs)
+    return langs
+
+
+def recognize_pages(images: List[Image.Image], highres_images: List[Image.Image]) -> List[str]:
+    """
+    Run Surya detection and recognition on a batch of page images. The two
+    run as separate steps so each is timed on its own.
+
+    Args:
+        images (List[Image.Image]): Page images used for detection and recognition.
+        highres_images (List[Image.Image]): High resolution copies of the same pages.
+
+    Returns:
+        List[str]: Recognized text of each page, one line per detected text line.
+    """
+    langs = recognition_langs()
+    with timed("ocr", "surya_detection"):
+        det_preds = predictors["detection"](images)
+    polygons = [[box.polygon for box in pred.bboxes] for pred in det_preds]
+    with timed("ocr", "surya_recognition"):
+        ocr_preds = predictors["recognition"](
+            images, [langs]*len(images),
+            polygons=polygons,
+            highres_images=highres_images
+        )
+    return ["\n".join(line.text.strip() for line in o.text_lines).strip() for o in ocr_preds]
 
 
-def get_page_image(stream: io.BytesIO, page: int, dpi: int) -> Image.Image:
-    doc = open_pdf(stream)
-    bmp = doc.render(
-        pypdfium2.PdfBitmap.to_pil,
-        page_indices=[page - 1],
-        scale=dpi / 72,
-    )
-    img = list(bmp)[0].convert("RGB")
-    doc.close()
-    return img
+def recognize_regions(images: List[Image.Image], highres_images: List[Image.Image],
+                      document_types: List[Optional[str]]) -> List[Optional[str]]:
+    """
+    Recognize only the anchor and field lines of pages whose document type has
+    a layout template (see ocr.templates), without text detection.
+
+    Returns:
+        List[Optional[str]]: Text of each page, None for pages without a
+        template or whose layout did not align with it.
+    """
+    texts = [None] * len(images)
+    plans = []
+    with timed("ocr", "roi_align"):
+        for i, (image, document_type) in enumerate(zip(images, document_types)):
+            template = get_template(document_type)
+            if template is None:
+                continue
+            boxes = align(template, image)
+            if boxes is None:
+                TEMPLATE_PAGES.labels("ocr", "unaligned").inc()
+                continue
+            plans.append((i, template, boxes))
+    if not plans:
+        return texts
+
+    langs = recognition_langs()
+    with timed("ocr", "roi_recognition"):
+        ocr_preds = predictors["recognition"](
+            [images[i] for i, _, _ in plans], [langs]*len(plans),
+            polygons=[[box_polygon(box) for box in boxes] for _, _, boxes in plans],
+            highres_images=[highres_images[i] for i, _, _ in plans]
+        )
+    for (i, template, boxes), pred in zip(plans, ocr_preds):
+        texts[i] = read_regions(template, boxes, pred.text_lines)
+        TEMPLATE_PAGES.labels("ocr", "anchor_mismatch" if texts[i] is None else "roi").inc()
+    return texts
+
+
+def recognize_images(images: List[Image.Image], highres_images: List[Image.Image],
+                     document_types: List[Optional[str]] = None) -> List[str]:
+    """
+    Recognize a batch of page images. Pages of document types with a layout
+    template are read from their field regions only; the rest, and templated
+    pages that do not align, get full-page OCR.
+
+    Args:
+        images (List[Image.Image]): Page images used for detection and recognition.
+        highres_images (List[Image.Image]): High resolution copies of the same pages.
+        document_types (List[Optional[str]]): Expected document type of each page, if known.
+
+    Returns:
+        List[str]: Recognized text of each page.
+    """
+    texts = [None] * len(images)
+    if OCR_ROI_TEMPLATES == '1' and document_types:
+        texts = recognize_regions(images, highres_images, document_types)
+
+    full_page = [i for i, text in enumerate(texts) if text is None]
+    if full_page:
+        page_texts = recognize_pages([images[i] for i in full_page], [highres_images[i] for i in full_page])
+        for i, text in zip(full_page, page_texts):
+            texts[i] = text
+    return texts
 
 
 def extract_text_from_image(file_path: str, batch_size: int = 4, use_gpu: bool = True) -> str:
@@ -43,48 +233,25 @@ def extract_text_from_image(file_path: str, batch_size: int = 4, use_gpu: bool =
     """
     device = "cuda" if (use_gpu and torch.cuda.is_available()) else "cpu"
     print(f"→ Using device: {device}")
-    global predictors
-
-    # Load input as PIL images
-    ext = file_path.lower().rsplit(".", 1)[-1]
-    pil_imgs: List[Image.Image] = []
-    pil_highres: List[Image.Image] = []
-
-    if ext == "pdf":
-        data = open(file_path, "rb").read()
-        buf = io.BytesIO(data)
-        doc = open_pdf(buf)
-        n_pages = len(doc)
-        doc.close()
-        for p in range(1, n_pages + 1):
-            pil_imgs.append(get_page_image(buf, p, settings.IMAGE_DPI))
-            pil_highres.append(get_page_image(buf, p, settings.IMAGE_DPI_HIGHRES))
-    else:
-        img = Image.open(file_path).convert("RGB")
-        pil_imgs = [img]
-        pil_highres = [img]
-
-    # Helper to batch inputs
-    def batched(lst, n):
-        for i in range(0, len(lst), n):
-            yield lst[i : i + n]
 
     # OCR text result
-    final_text = ""
+    page_texts = []
 
-    # Process in batches
-    for batch_imgs, batch_high in zip(batched(pil_imgs, batch_size), batched(pil_highres, batch_size)):
-        langs = ["en"]
-        replace_lang_with_code(langs)
-        ocr_preds = predictors["recognition"](
-            batch_imgs, [langs]*len(batch_imgs),
-            predictors["detection"],
-            highres_images=batch_high
-        )
+    if file_path.lower().endswith(".pdf"):
+        with open(file_path, "rb") as f:
+            renderer = PdfPageRenderer(f.read())
+        try:
+            # Only one batch of pages is rendered and resident at a time
+            for start in range(0, len(renderer), batch_size):
+                batch_imgs, batch_high = renderer.render_pages(range(start, min(start + batch_size, len(renderer))))
+                page_texts.extend(recognize_images(batch_imgs, batch_high))
+        finally:
+            renderer.close()
+    else:
+        img = Image.open(file_path).convert("RGB")
+        page_texts.extend(recognize_images([img], [img]))
 
-        for o in ocr_preds:
-            for line in o.text_lines:
-                final_text += line.text.strip() + "\n"
+    final_text = "\n".join(text for text in page_texts if text)
 
     result = {
         "extracted_text": final_text.strip(),
@@ -2,20 +2,37 @@
 import uvicorn
 import logging
 import torch
-import aiofiles
 from PIL import Image
-from pathlib import Path
-from fastapi import FastAPI, HTTPException, File, UploadFile
-from .extract import extract_text_from_image, load_model_once, logger
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form
+from .extract import load_model_once, is_pdf, PdfPageRenderer, logger
+from .batcher import OCRBatcher
 
 # Internal Libraries
-from config.settings import IS_CUDA_CHECK_NEEDED, CUDA_CONFIGURED
+from common.inference_executor import InferenceExecutor, QueueFullError
+from common.cache import DocumentCache, make_cache_key
+from common.metrics import instrument_app, timed, PAGES
+from common.page_codec import is_page_frames, decode_pages, available_codecs
+from config.settings import (
+    IS_CUDA_CHECK_NEEDED,
+    CUDA_CONFIGURED,
+    OCR_MAX_BATCH_SIZE,
+    OCR_MAX_BATCH_WAIT_MS,
+    OCR_INFERENCE_WORKERS,
+    OCR_INFERENCE_QUEUE,
+    OCR_TEXT_LAYER,
+    OCR_TEXT_LAYER_MIN_CHARS,
+    OCR_TEXT_LAYER_MAX_IMAGE_SHARE,
+    OCR_TEXT_LAYER_MIN_COVERAGE,
+    OCR_DERIVE_LOWRES,
+    OCR_ROI_TEMPLATES,
+)
 
 load_model_once()
 
 # Python Libraries
-import os
-import time
+import asyncio
+import io
 
 if CUDA_CONFIGURED=='1':
     torch.cuda.empty_cache()
@@ -28,66 +45,175 @@ if IS_CUDA_CHECK_NEEDED == '1':
         logger.error("GPU not accessible, stopping program")
         exit()
 
-app = FastAPI()
+# Settings that change the extracted text, so cached results of other settings are not reused
+OUTPUT_SETTINGS = [str(setting) for setting in (
+    OCR_TEXT_LAYER, OCR_TEXT_LAYER_MIN_CHARS, OCR_TEXT_LAYER_MAX_IMAGE_SHARE, OCR_TEXT_LAYER_MIN_COVERAGE,
+    OCR_DERIVE_LOWRES, OCR_ROI_TEMPLATES,
+)]
+
+inference_executor = InferenceExecutor("ocr", OCR_INFERENCE_WORKERS, OCR_INFERENCE_QUEUE)
+batcher = OCRBatcher(inference_executor, OCR_MAX_BATCH_SIZE, OCR_MAX_BATCH_WAIT_MS, OCR_INFERENCE_QUEUE)
+ocr_cache = DocumentCache("ocr")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    batcher.start()
+    yield
+    await batcher.stop()
+    inference_executor.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+instrument_app(app, "ocr")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Get the base directory from an environment variable, with a default value
-BASE_DIR = Path(__file__).resolve().parent
+async def recognize_pdf(renderer: PdfPageRenderer, first_page: int = 1, last_page: int = None, document_type: str = None):
+    """
+    Extract the text of the pages first_page to last_page (1-based, inclusive,
+    None for the last page) of a PDF.
+
+    Pages with a usable embedded text layer skip OCR; each page's record says
+    why its text layer was or was not used. The remaining pages are
+    OCR'd one window of OCR_MAX_BATCH_SIZE pages at a time, rendering the next
+    window while the current one is recognized, so at most two windows of page
+    images are resident. Pages of document types with a layout template only
+    have their field regions recognized.
+
+    Returns:
+        tuple: (text of each page, per-page record of where the text came from).
+    """
+    indices = list(range(len(renderer)))[max(first_page, 1) - 1:last_page]
+    page_count = len(indices)
+    layers = [(None, "text_layer_disabled")] * page_count
+    if OCR_TEXT_LAYER == '1':
+        with timed("ocr", "text_layer"):
+            layers = await asyncio.to_thread(lambda: [renderer.text_layer(i) for i in indices])
+    page_texts = [text for text, _ in layers]
+    pages = [
+        {"page": index + 1, "source": "ocr" if text is None else "text_layer", "reason": reason}
+        for index, (text, reason) in zip(indices, layers)
+    ]
+
+    # Positions in page_texts, mapped back to PDF page indices when rendering
+    ocr_indices = [i for i, text in enumerate(page_texts) if text is None]
+    PAGES.labels("ocr", "text_layer").inc(page_count - len(ocr_indices))
+    PAGES.labels("ocr", "ocr").inc(len(ocr_indices))
+    windows = [ocr_indices[i:i + OCR_MAX_BATCH_SIZE] for i in range(0, len(ocr_indices), OCR_MAX_BATCH_SIZE)]
+
+    def render_window(window):
+        return renderer.render_pages([indices[i] for i in window])
+
+    pending = None
+    for n, window in enumerate(windows):
+        if pending is None:
+            pending = asyncio.create_task(asyncio.to_thread(render_window, window))
+        images, highres_images = await pending
+        pending = None
+        if n + 1 < len(windows):
+            pending = asyncio.create_task(asyncio.to_thread(render_window, windows[n + 1]))
+        try:
+            texts = await batcher.submit_many(images, highres_images, document_type)
+        except BaseException:
+            if pending is not None:
+                pending.cancel()
+            raise
+        for i, text in zip(window, texts):
+            page_texts[i] = text
+
+    return page_texts, pages
 
 @app.post("/extract-text")
-async def process_data(file: UploadFile = File(...)) -> dict:
-    file_path = None
+async def process_data(
+    file: UploadFile = File(...),
+    document_type: str = Form(None),
+    first_page: int = Form(1),
+    last_page: int = Form(None)
+) -> dict:
     try:
-        # Validate if the file is an image
-        file.file.seek(0)  # Reset file pointer
-        try:
-            image = Image.open(file.file)
-            image.verify()  # Verify image integrity
-            file.file.seek(0)  # Reset again for further operations
-        except Exception as e:
-            logger.error(f"Uploaded file is not a valid image: {e}")
-            raise HTTPException(status_code=400, detail="Uploaded file is not a valid image.")
-        
-        # Create the /image directory if it doesn't exist
-        image_dir = BASE_DIR / "images"
-        image_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate a unique file name using timestamp
-        timestamp = int(time.time())
-        file_path = image_dir / f"{timestamp}_{file.filename}"
-
-        print("Processing image on OCR")
-        
-        async with aiofiles.open(file_path, "wb") as buffer:
-            await buffer.write(await file.read())
-            buffer.write(await file.read())
-
-        print("Written by buffer")
-        
-        # Call the extract_text_from_image function with the saved file path
-        result = extract_text_from_image(str(file_path))
-        
+        data = await file.read()
+
+        # Re-uploads of the same document are answered from the cache
+        cache_key = make_cache_key("ocr", document_type, data, str(first_page), str(last_page), *OUTPUT_SETTINGS)
+        cached = await ocr_cache.get(cache_key)
+        if cached is not None:
+            logger.info("OCR cache hit")
+            return cached
+
+        if is_pdf(data):
+            logger.info("Processing PDF on OCR")
+            try:
+                renderer = await asyncio.to_thread(PdfPageRenderer, data)
+            except Exception as e:
+                logger.error(f"Uploaded file is not a valid PDF: {e}")
+                raise HTTPException(status_code=400, detail="Uploaded file is not a valid PDF.")
+            try:
+                page_texts, pages = await recognize_pdf(renderer, first_page, last_page, document_type)
+            finally:
+                await asyncio.to_thread(renderer.close)
+        elif is_page_frames(data):
+            # Raw or compressed pixel buffers, no image decoding needed
+            try:
+                with timed("ocr", "page_decode"):
+                    frames = await asyncio.to_thread(decode_pages, data)
+            except ValueError as e:
+                logger.error(f"Uploaded page frames are invalid: {e}")
+                raise HTTPException(status_code=400, detail=f"Invalid page frames: {e}")
+            images = [
+                Image.frombuffer(frame.mode, (frame.width, frame.height), frame.data, "raw", frame.mode, 0, 1).convert("RGB")
+                for frame in frames
+            ]
+            del frames
+            page_texts = await batcher.submit_many(images, images, document_type)
+            PAGES.labels("ocr", "page_frames").inc(len(images))
+            # Frames of one render window, first_page is the window's first page in the document
+            pages = [{"page": first_page + i, "source": "ocr"} for i in range(len(images))]
+        else:
+            # Validate if the file is an image
+            try:
+                image = Image.open(io.BytesIO(data))
+                image.verify()  # Verify image integrity
+            except Exception as e:
+                logger.error(f"Uploaded file is not a valid image: {e}")
+                raise HTTPException(status_code=400, detail="Uploaded file is not a valid image.")
+
+            logger.info("Processing image on OCR")
+
+            # verify() leaves the image unusable, so decode it again for inference
+            image = Image.open(io.BytesIO(data)).convert("RGB")
+            page_texts = [await batcher.submit(image, document_type=document_type)]
+            PAGES.labels("ocr", "image").inc()
+            pages = [{"page": 1, "source": "ocr"}]
+
+        result = {
+            "extracted_text": "\n\n".join(page_texts),
+            "page_texts": page_texts,
+            "pages": pages,
+        }
+        await ocr_cache.set(cache_key, result)
+
         # Return the result
         logger.info(f"Extracted text: {result['extracted_text']}")
         return result
-    
+
     except HTTPException as e:
         raise e
+    except QueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="OCR server is busy, retry later.")
     except Exception as e:
         logger.exception("An error occurred while processing the file.")
         raise HTTPException(status_code=500, detail="An internal server error occurred.")
-    
-    finally:
-        # Delete the image file after use if it was saved
-        if file_path and file_path.exists():
-            try:
-                file_path.unlink()
-                logger.info(f"Deleted image file: {file_path}")
-            except Exception as e:
-                logger.error(f"Failed to delete image file {file_path}: {e}")
+
+@app.get("/health")
+async def health():
+    # Lets the poppler server pick a page transport this replica can decode
+    return {"status": "ok", "page_codecs": available_codecs()}
+
+@app.get("/inference-stats")
+async def inference_stats() -> dict:
+    return {**inference_executor.stats(), **batcher.stats(), "cache": ocr_cache.stats()}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,174 @@
+# Installed Libraries
+import numpy as np
+from PIL import Image
+
+# Python Libraries
+from difflib import SequenceMatcher
+from typing import List, NamedTuple, Optional, Tuple
+
+# (left, top, right, bottom) as fractions of the document's content box
+Box = Tuple[float, float, float, float]
+
+
+class Region(NamedTuple):
+    """A single printed line holding one field."""
+    name: str
+    box: Box
+    # Written before the recognized text unless the line already carries it,
+    # so the poppler rules and the LLM see the label they key on
+    label: str = ""
+
+
+class Anchor(NamedTuple):
+    """Fixed printed text that must be recognized in its box for the layout to count as aligned."""
+    box: Box
+    text: str
+
+
+class LayoutTemplate(NamedTuple):
+    """
+    Where the fields of a fixed-layout document type are printed. Only the
+    anchor and field lines are recognized, with no text detection.
+    """
+    # Width / height of the content box
+    aspect_ratio: float
+    anchors: List[Anchor]
+    fields: List[Region]
+
+
+TEMPLATES = {
+    # Front of the card, 85.6 x 54 mm. The address is on the back, which does
+    # not match the anchor and gets full-page OCR
+    "aadhaar": LayoutTemplate(
+        aspect_ratio=1.585,
+        anchors=[Anchor((0.25, 0.02, 0.9, 0.16), "government of india")],
+        fields=[
+            Region("name", (0.3, 0.3, 0.97, 0.41)),
+            Region("date_of_birth", (0.3, 0.41, 0.97, 0.51), "DOB"),
+            Region("gender", (0.3, 0.51, 0.97, 0.61), "Gender"),
+            Region("aadhaar_number", (0.2, 0.76, 0.8, 0.88), "Aadhaar No"),
+        ],
+    ),
+    # A4 portrait; the header line also carries the exam year
+    "gate_score_card": LayoutTemplate(
+        aspect_ratio=0.707,
+        anchors=[Anchor((0.1, 0.0, 0.9, 0.08), "graduate aptitude test in engineering")],
+        fields=[
+            Region("name", (0.05, 0.2, 0.95, 0.26), "Name of Candidate"),
+            Region("registration_number", (0.05, 0.26, 0.95, 0.32), "Registration Number"),
+            Region("marks_out_of_100", (0.05, 0.5, 0.95, 0.56), "Marks out of 100"),
+            Region("all_india_rank_in_this_paper", (0.05, 0.56, 0.95, 0.62), "All India Rank"),
+            Region("gate_score", (0.05, 0.62, 0.95, 0.68), "GATE Score"),
+        ],
+    ),
+}
+
+# Content boxes whose aspect ratio is further than this from the template's are not the document
+ASPECT_TOLERANCE = 0.12
+# Share of an anchor's characters that must be recognized, in order
+ANCHOR_MIN_MATCH = 0.8
+
+# Alignment runs on a copy with this long side
+ALIGN_SIDE = 600
+# Dark pixels count as ink below this level
+INK_LEVEL = 160
+
+
+def get_template(document_type: Optional[str]) -> Optional[LayoutTemplate]:
+    return TEMPLATES.get(document_type)
+
+
+def content_box(image: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Bounding box of the page's ink in image pixels. Rows and columns that are
+    almost entirely dark are background or scanner borders and are skipped.
+    """
+    factor = max(1, max(image.size) // ALIGN_SIDE)
+    gray = np.asarray(image.reduce(factor).convert("L"))
+    ink = gray < INK_LEVEL
+    row_ink = ink.mean(axis=1)
+    col_ink = ink.mean(axis=0)
+    rows = np.flatnonzero((row_ink > 0.002) & (row_ink < 0.9))
+    cols = np.flatnonzero((col_ink > 0.002) & (col_ink < 0.9))
+    if rows.size == 0 or cols.size == 0:
+        return None
+    return (
+        int(cols[0]) * factor, int(rows[0]) * factor,
+        min((int(cols[-1]) + 1) * factor, image.width), min((int(rows[-1]) + 1) * factor, image.height),
+    )
+
+
+def align(template: LayoutTemplate, image: Image.Image) -> Optional[List[List[float]]]:
+    """
+    Map the template onto the page through its content box.
+
+    Returns:
+        Pixel boxes of the anchors followed by the fields, or None if the
+        content box does not have the template's shape.
+    """
+    box = content_box(image)
+    if box is None:
+        return None
+    left, top, right, bottom = box
+    width, height = right - left, bottom - top
+    if width < 32 or height < 32 or abs(width / height / template.aspect_ratio - 1) > ASPECT_TOLERANCE:
+        return None
+    return [
+        [left + x0 * width, top + y0 * height, left + x1 * width, top + y1 * height]
+        for x0, y0, x1, y1 in [anchor.box for anchor in template.anchors] + [field.box for field in template.fields]
+    ]
+
+
+def box_polygon(box: List[float]) -> List[List[float]]:
+    left, top, right, bottom = box
+    return [[left, top], [right, top], [right, bottom], [left, bottom]]
+
+
+def overlap(a: List[float], b: List[float]) -> float:
+    """Intersection over union of two boxes."""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    intersection = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union
+
+
+def normalize(text: str) -> str:
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in text.lower()).split())
+
+
+def anchor_matches(expected: str, text: str) -> bool:
+    expected, text = normalize(expected), normalize(text)
+    matched = sum(block.size for block in SequenceMatcher(None, expected, text, autojunk=False).get_matching_blocks())
+    return matched >= len(expected) * ANCHOR_MIN_MATCH
+
+
+def read_regions(template: LayoutTemplate, boxes: List[List[float]], text_lines) -> Optional[str]:
+    """
+    Assemble the page text from the recognized lines of the boxes align returned.
+
+    Returns:
+        The anchor lines followed by one "label: value" line per field, or None
+        if an anchor was not found or any field came back empty, which means a
+        box missed its line and the page needs full-page OCR.
+    """
+    # Recognition may reorder the lines, each is matched back to its box
+    texts = []
+    for box in boxes:
+        line = max(text_lines, key=lambda line: overlap(box, line.bbox), default=None)
+        texts.append(line.text.strip() if line is not None and overlap(box, line.bbox) > 0.5 else "")
+
+    anchor_texts, field_texts = texts[:len(template.anchors)], texts[len(template.anchors):]
+    if not all(anchor_matches(anchor.text, text) for anchor, text in zip(template.anchors, anchor_texts)):
+        return None
+    if not all(field_texts):
+        return None
+
+    lines = list(anchor_texts)
+    for field, text in zip(template.fields, field_texts):
+        if field.label and normalize(field.label) not in normalize(text):
+            text = f"{field.label}: {text}"
+        lines.append(text)
+    return "\n".join(lines)
@@ -0,0 +1,221 @@
+# Installed Libraries
+import httpx
+import logging
+
+# Internal Libraries
+from config.settings import (
+    OCR_SERVERS,
+    LLM_SERVERS,
+    HEALTH_CHECK_INTERVAL,
+    HEALTH_CHECK_TIMEOUT,
+    BACKEND_EJECT_AFTER_FAILURES,
+    OCR_HEDGE_PERCENTILE,
+    LLM_HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+)
+from .http_client import get_http_client
+
+# Python Libraries
+import asyncio
+import random
+import time
+from collections import deque
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The request never reached the replica, so it is safe to send it to another one
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, OSError)
+
+
+class Backend:
+    def __init__(self, address: str):
+        self.base_url = address if address.startswith("http") else f"http://{address}"
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        # What the replica reported about itself on its last health check
+        self.capabilities = {}
+
+    def __repr__(self):
+        return self.base_url
+
+
+class BackendPool:
+    """
+    Client-side load balancer over the replicas of one stage (OCR or LLM).
+
+    Requests go to the healthy replica with the fewest requests in flight.
+    A replica is ejected after BACKEND_EJECT_AFTER_FAILURES consecutive
+    failures (connection errors or 5xx other than 503) and reinstated by the
+    first health check it passes. A 503 or a read timeout means the replica is
+    busy, not down, and does not count. A request whose connection fails is
+    retried on another replica. Requests still running past the
+    hedge_percentile latency of their kind get a backup copy on another
+    replica, and the first answer wins.
+    """
+
+    def __init__(self, name: str, addresses: list, hedge_percentile: float = 0, health_path: str = "/health"):
+        self.name = name
+        self.backends = [Backend(address) for address in addresses]
+        self.hedge_percentile = hedge_percentile
+        self.health_path = health_path
+        # Recent latencies per kind of request, e.g. a single page and a whole PDF take very different times
+        self.latencies = {}
+        self.health_task = None
+
+    def start(self):
+        if self.health_task is None:
+            self.health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        if self.health_task is not None:
+            self.health_task.cancel()
+            await asyncio.gather(self.health_task, return_exceptions=True)
+            self.health_task = None
+
+    def pick(self, exclude=()) -> Backend:
+        candidates = [backend for backend in self.backends if backend.healthy and backend not in exclude]
+        if not candidates:
+            # Every replica looks down, trying one beats failing outright
+            candidates = [backend for backend in self.backends if backend not in exclude] or self.backends
+        fewest = min(backend.outstanding for backend in candidates)
+        return random.choice([backend for backend in candidates if backend.outstanding == fewest])
+
+    def hedge_delay(self, kind: str):
+        """Latency past which a backup request of kind is sent, None while there is too little data."""
+        latencies = self.latencies.get(kind, ())
+        if self.hedge_percentile <= 0 or len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        latencies = sorted(latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))]
+
+    def record_failure(self, backend: Backend):
+        backend.consecutive_failures += 1
+        if backend.healthy and backend.consecutive_failures >= BACKEND_EJECT_AFTER_FAILURES:
+            backend.healthy = False
+            logger.warning(f"Ejected {self.name} backend {backend} after {backend.consecutive_failures} failures")
+
+    def record_success(self, backend: Backend):
+        backend.consecutive_failures = 0
+        if not backend.healthy:
+            backend.healthy = True
+            logger.info(f"Reinstated {self.name} backend {backend}")
+
+    async def _attempt(self, backend: Backend, send, kind: str) -> httpx.Response:
+        backend.outstanding += 1
+        started = time.perf_counter()
+        try:
+            response = await send(backend.base_url)
+        except CONNECT_ERRORS:
+            self.record_failure(backend)
+            raise
+        finally:
+            backend.outstanding -= 1
+
+        if response.status_code == 503:
+            # Busy with a full queue, ejecting it would only move its load onto the others
+            pass
+        elif response.status_code >= 500:
+            self.record_failure(backend)
+        else:
+            self.record_success(backend)
+            self.latencies.setdefault(kind, deque(maxlen=500)).append(time.perf_counter() - started)
+        return response
+
+    async def _send(self, backend: Backend, send, kind: str) -> httpx.Response:
+        """Attempt the request on backend, moving on to other replicas while connections fail."""
+        tried = [backend]
+        while True:
+            try:
+                return await self._attempt(backend, send, kind)
+            except CONNECT_ERRORS as e:
+                if len(tried) >= len(self.backends):
+                    raise
+                backend = self.pick(exclude=tried)
+                tried.append(backend)
+                logger.warning(f"Retrying {self.name} request on {backend} after a connection error: {e!r}")
+
+    async def request(self, send, kind: str = "default") -> httpx.Response:
+        """
+        Send a request through the pool.
+
+        Args:
+            send: Coroutine function taking a replica's base URL and returning its response.
+            kind: Kind of request, hedging compares its latency only with requests of the same kind.
+
+        Returns:
+            httpx.Response: The first response received.
+        """
+        primary = self.pick()
+        first = asyncio.create_task(self._send(primary, send, kind))
+        delay = self.hedge_delay(kind)
+        if delay is None or len(self.backends) < 2:
+            return await first
+
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done:
+                return first.result()
+
+            backup = self.pick(exclude=(primary,))
+            logger.info(f"Hedging slow {self.name} request on {primary} with {backup}")
+            tasks.append(asyncio.create_task(self._send(backup, send, kind)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # A failed copy only matters if the other one fails too
+                    if task.exception() is None and task.result().status_code < 500:
+                        return task.result()
+            return first.result()
+        finally:
+            # Also reached when the caller is cancelled while waiting
+            for task in tasks:
+                task.cancel()
+
+    async def _check(self, backend: Backend):
+        try:
+            response = await get_http_client().get(f"{backend.base_url}{self.health_path}", timeout=HEALTH_CHECK_TIMEOUT)
+            response.raise_for_status()
+            capabilities = response.json()
+        except Exception:
+            self.record_failure(backend)
+        else:
+            backend.capabilities = capabilities if isinstance(capabilities, dict) else {}
+            self.record_success(backend)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.gather(*(self._check(backend) for backend in self.backends))
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+    def common_capability(self, key: str) -> set:
+        """
+        Values of a list capability every healthy replica reported, so a
+        request can use them whichever replica it (or its hedge) lands on.
+        """
+        backends = [backend for backend in self.backends if backend.healthy] or self.backends
+        values = [set(backend.capabilities.get(key) or []) for backend in backends]
+        return set.intersection(*values) if values else set()
+
+    def stats(self) -> list:
+        return [
+            {"url": backend.base_url, "healthy": backend.healthy, "outstanding": backend.outstanding}
+            for backend in self.backends
+        ]
+
+
+ocr_pool = BackendPool("ocr", OCR_SERVERS, OCR_HEDGE_PERCENTILE)
+llm_pool = BackendPool("llm", LLM_SERVERS, LLM_HEDGE_PERCENTILE)
+
+
+def start_balancers():
+    ocr_pool.start()
+    llm_pool.start()
+
+
+async def stop_balancers():
+    await ocr_pool.stop()
+    await llm_pool.stop()
@@ -0,0 +1,115 @@
+# Python Libraries
+import re
+from typing import NamedTuple, Optional
+
+# Weighted keywords per document type. Covers the prompt_schema types and the
+# extra types the LLM template knows about.
+KEYWORDS = {
+    "aadhaar": {
+        "unique identification authority": 4, "aadhaar": 3, "aadhar": 3, "आधार": 3,
+        "enrolment no": 2, "vid": 1, "government of india": 1,
+    },
+    "birth_cert": {
+        "birth certificate": 4, "certificate of birth": 4, "registration of births": 3,
+        "place of birth": 2, "registrar": 1,
+    },
+    "marksheet": {
+        "statement of marks": 4, "mark sheet": 4, "marksheet": 4, "marks obtained": 2,
+        "maximum marks": 2, "grand total": 2, "roll no": 1, "subject": 1,
+    },
+    "degree_cert": {
+        "convocation": 3, "conferred": 3, "in testimony whereof": 3, "bachelor of": 2,
+        "master of": 2, "degree": 1,
+    },
+    "provisional_cert": {
+        "provisional certificate": 5, "provisional": 2, "passed the": 1,
+    },
+    "gate_score_card": {
+        "graduate aptitude test in engineering": 5, "gate score": 3, "all india rank": 3,
+        "score card": 2, "scorecard": 2, "gate": 1,
+    },
+    "experience_cert": {
+        "experience certificate": 5, "to whom it may concern": 1, "was working": 2,
+        "worked with": 2, "employed": 1,
+    },
+    "phd_cert": {
+        "doctor of philosophy": 5, "ph.d": 3, "phd": 3, "thesis": 2,
+    },
+    "proof_of_category": {
+        "scheduled caste": 3, "scheduled tribe": 3, "backward class": 3, "caste": 2,
+        "category": 1,
+    },
+    "community_cert": {
+        "community certificate": 5, "community": 2,
+    },
+    "proof_of_address": {
+        "address proof": 3, "electricity bill": 3, "residence certificate": 3,
+        "domicile": 3, "resident of": 1,
+    },
+    "bonafide": {
+        "bonafide": 5, "bona fide": 5, "is a student of": 2, "studying in": 1,
+    },
+    "person_with_disability": {
+        "percentage of disability": 5, "disability": 3, "disabled": 2,
+    },
+}
+
+PATTERNS = {
+    document_type: [(re.compile(r"(?<!\w)" + re.escape(keyword) + r"(?!\w)"), weight) for keyword, weight in keywords.items()]
+    for document_type, keywords in KEYWORDS.items()
+}
+
+# A keyword counts at most this many times, so one repeated header cannot dominate
+MAX_KEYWORD_HITS = 3
+
+
+class Classification(NamedTuple):
+    document_type: Optional[str]
+    confidence: float
+    score: float
+
+
+class DocumentTypeMismatch(Exception):
+    """Raised when a document is confidently classified as another type than expected."""
+
+    def __init__(self, classification: Classification):
+        super().__init__(f"Document classified as {classification.document_type}")
+        self.classification = classification
+
+
+def classify(text: str) -> Classification:
+    """
+    Score the text against every type's keywords.
+
+    Confidence is the winning type's share of the two best scores, so 1.0 means
+    no other type matched at all and 0.5 means a tie.
+    """
+    text = text.lower()
+    scores = {
+        document_type: sum(weight * min(len(pattern.findall(text)), MAX_KEYWORD_HITS) for pattern, weight in patterns)
+        for document_type, patterns in PATTERNS.items()
+    }
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best_type, best), (_, second) = ranked[0], ranked[1]
+    if best == 0:
+        return Classification(None, 0.0, 0.0)
+    return Classification(best_type, best / (best + second), best)
+
+
+def check_document_type(text: str, expected_type: str, min_confidence: float, min_score: float) -> Classification:
+    """
+    Classify the text and reject confident mismatches. Ambiguous or weak
+    classifications pass through so the LLM can decide.
+
+    Raises:
+        DocumentTypeMismatch: If another type wins confidently.
+    """
+    classification = classify(text)
+    if (
+        classification.document_type is not None
+        and classification.confidence >= min_confidence
+        and classification.score >= min_score
+        and classification.document_type != expected_type
+    ):
+        raise DocumentTypeMismatch(classification)
+    return classification
@@ -0,0 +1,132 @@
+# Installed Libraries
+import logging
+
+# Internal Libraries
+from config.settings import POPPLER_PROCESS_POOL, POPPLER_PROCESS_WORKERS
+
+# Python Libraries
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SharedBuffer(NamedTuple):
+    """A buffer a worker process left in shared memory for the server to pick up."""
+    name: str
+    size: int
+
+
+# Set by the pool's initializer. Uvicorn --workers and --reload processes also
+# have a parent process, but are servers and must not hand off through shared memory
+pool_worker = False
+
+
+def mark_pool_worker():
+    global pool_worker
+    pool_worker = True
+
+
+def in_worker_process() -> bool:
+    return pool_worker
+
+
+def hand_off(data: bytes):
+    """
+    Return data from a CPU pool task. In a worker process it is written to a
+    shared memory block, so only the block's name is pickled back; the server
+    copies it out once and frees the block. In a thread it is returned as-is.
+    """
+    if not in_worker_process():
+        return data
+    block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    block.buf[:len(data)] = data
+    block.close()
+    return SharedBuffer(block.name, len(data))
+
+
+def receive(result) -> bytes:
+    """Counterpart of hand_off on the server side."""
+    if not isinstance(result, SharedBuffer):
+        return result
+    block = shared_memory.SharedMemory(name=result.name)
+    try:
+        return bytes(block.buf[:result.size])
+    finally:
+        block.close()
+        block.unlink()
+
+
+def release(results):
+    """Free shared memory blocks of results nobody will receive."""
+    for result in results if isinstance(results, list) else [results]:
+        if isinstance(result, SharedBuffer):
+            try:
+                receive(result)
+            except FileNotFoundError:
+                pass
+
+
+class CPUPool:
+    """
+    Runs poppler's CPU-bound stages (rasterization, preprocessing, encoding)
+    in worker processes, so one server process uses every core
+    instead of contending for the GIL. Tasks return their page buffers
+    through hand_off; run() receives them.
+
+    Without a started process pool, tasks run on the default thread pool.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+
+    def start(self):
+        if self.executor is None:
+            # spawn, as forking a process with a running event loop and threads is unsafe
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                initializer=mark_pool_worker)
+            logger.info(f"Started CPU pool with {self.workers} worker process(es)")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, fn, *args):
+        """
+        Run fn(*args) in the pool.
+
+        Returns:
+            The result, with SharedBuffers (alone or in a list) received as bytes.
+        """
+        if self.executor is None:
+            result = await asyncio.to_thread(fn, *args)
+        else:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The task still finishes in its worker, its buffers must not leak
+                future.add_done_callback(lambda done: release(done.result()) if not done.cancelled() and done.exception() is None else None)
+                raise
+        if isinstance(result, list):
+            return [receive(item) for item in result]
+        return receive(result)
+
+
+cpu_pool = CPUPool(POPPLER_PROCESS_WORKERS)
+
+
+def start_cpu_pool():
+    if POPPLER_PROCESS_POOL == '1':
+        cpu_pool.start()
+
+
+def stop_cpu_pool():
+    cpu_pool.shutdown()
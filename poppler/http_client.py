@@ -0,0 +1,52 @@
+# Installed Libraries
+import httpx
+
+# Internal Libraries
+from common.metrics import REQUEST_ID_HEADER, get_request_id
+from config.settings import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    OCR_CONNECT_TIMEOUT,
+    OCR_READ_TIMEOUT,
+    LLM_CONNECT_TIMEOUT,
+    LLM_READ_TIMEOUT,
+)
+
+# Timeouts are passed per request so each backend keeps its own budget
+OCR_TIMEOUT = httpx.Timeout(OCR_READ_TIMEOUT, connect=OCR_CONNECT_TIMEOUT)
+LLM_TIMEOUT = httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+client = None
+
+async def add_request_id(request: httpx.Request):
+    # Lets the OCR and LLM servers log and time the same request id
+    request_id = get_request_id()
+    if request_id and REQUEST_ID_HEADER not in request.headers:
+        request.headers[REQUEST_ID_HEADER] = request_id
+
+def start_http_client():
+    """Create the application-wide connection pool. Called on FastAPI startup."""
+    global client
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            event_hooks={"request": [add_request_id]},
+        )
+    return client
+
+async def close_http_client():
+    """Close the connection pool. Called on FastAPI shutdown."""
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    if client is None:
+        raise RuntimeError("HTTP client is not started, call start_http_client() first")
+    return client
@@ -0,0 +1,299 @@
+# Installed Libraries
+import logging
+from fastapi import HTTPException
+
+# Internal Libraries
+from config.settings import JOB_WORKERS, JOB_POLL_INTERVAL, JOB_STALE_SECONDS, JOB_CALLBACK_HOSTS
+from .http_client import get_http_client, start_http_client, close_http_client
+from common.metrics import request_id_var
+
+# Python Libraries
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Jobs share the applications collection with other records, this tells them apart
+JOB_KIND = "validate_job"
+
+# Fields returned by the status endpoint, the upload itself is never sent back
+STATUS_FIELDS = {"_id": 1, "status": 1, "document_type": 1, "filename": 1, "created_at": 1,
+                 "started_at": 1, "finished_at": 1, "error": 1}
+
+
+# Stale running jobs are looked for this often, in seconds
+REQUEUE_INTERVAL = 60
+# Attempts at storing a job's result, with FINISH_RETRY_DELAY seconds doubling in between
+FINISH_ATTEMPTS = 3
+FINISH_RETRY_DELAY = 1.0
+
+
+def get_collection():
+    # Imported lazily so the API starts without Mongo when jobs are unused
+    from .mongodb_config import applications_collection
+    return applications_collection
+
+
+def get_file_store():
+    # Uploads live in GridFS, a multi-page PDF can exceed Mongo's 16MB document limit
+    import gridfs
+    from .mongodb_config import db
+    return gridfs.GridFS(db, collection="job_uploads")
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+def callback_allowed(callback_url: str) -> bool:
+    """
+    Callbacks are posted from inside the service network, so only http(s)
+    URLs on the configured JOB_CALLBACK_HOSTS are accepted.
+    """
+    try:
+        parts = urlsplit(callback_url)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        return False
+    return parts.scheme in ("http", "https") and host in JOB_CALLBACK_HOSTS
+
+
+def serialize(job: dict) -> dict:
+    job = dict(job)
+    job["job_id"] = job.pop("_id")
+    for key in ("created_at", "started_at", "finished_at"):
+        if job.get(key) is not None:
+            job[key] = job[key].isoformat()
+    return job
+
+
+class JobStore:
+    """Persists validation jobs and their state in applications_collection."""
+
+    def __init__(self):
+        self.collection = None
+        self.files = None
+
+    def _collection(self):
+        if self.collection is None:
+            self.collection = get_collection()
+            self.collection.create_index([("kind", 1), ("status", 1), ("created_at", 1)])
+        return self.collection
+
+    def _files(self):
+        if self.files is None:
+            self.files = get_file_store()
+        return self.files
+
+    async def create(self, data: bytes, content_type: str, filename: str, document_type: str, callback_url: str = None) -> str:
+        job_id = uuid.uuid4().hex
+        file_id = await asyncio.to_thread(self._files().put, data, filename=filename, job_id=job_id)
+        job = {
+            "_id": job_id,
+            "kind": JOB_KIND,
+            "status": "queued",
+            "document_type": document_type,
+            "content_type": content_type,
+            "filename": filename,
+            "file_id": file_id,
+            "callback_url": callback_url,
+            "created_at": now(),
+        }
+        try:
+            await asyncio.to_thread(self._collection().insert_one, job)
+        except BaseException:
+            await asyncio.to_thread(self._files().delete, file_id)
+            raise
+        return job_id
+
+    async def read_upload(self, job: dict) -> bytes:
+        return await asyncio.to_thread(lambda: self._files().get(job["file_id"]).read())
+
+    async def get(self, job_id: str, with_result: bool = False):
+        projection = dict(STATUS_FIELDS)
+        if with_result:
+            projection.update({"result": 1, "status_code": 1})
+        return await asyncio.to_thread(
+            self._collection().find_one, {"_id": job_id, "kind": JOB_KIND}, projection
+        )
+
+    async def claim(self):
+        """Atomically move the oldest queued job to running, so each job runs once across workers."""
+        from pymongo import ReturnDocument
+
+        return await asyncio.to_thread(
+            self._collection().find_one_and_update,
+            {"kind": JOB_KIND, "status": "queued"},
+            {"$set": {"status": "running", "started_at": now()}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def finish(self, job_id: str, status: str, result: dict = None, status_code: int = None, error: str = None,
+                     file_id=None):
+        update = {"status": status, "finished_at": now(), "result": result, "status_code": status_code, "error": error}
+        # The upload is no longer needed once the job has run
+        await asyncio.to_thread(
+            self._collection().update_one, {"_id": job_id}, {"$set": update, "$unset": {"file_id": ""}}
+        )
+        if file_id is not None:
+            await asyncio.to_thread(self._files().delete, file_id)
+
+    async def requeue_stale(self, stale_seconds: float) -> int:
+        """Return jobs whose worker died mid-run to the queue."""
+        result = await asyncio.to_thread(
+            self._collection().update_many,
+            {"kind": JOB_KIND, "status": "running", "started_at": {"$lt": now() - timedelta(seconds=stale_seconds)}},
+            {"$set": {"status": "queued"}, "$unset": {"started_at": ""}},
+        )
+        return result.modified_count
+
+
+class JobWorkerPool:
+    """
+    Background workers that claim queued jobs and run them through process_fn.
+
+    process_fn(data, content_type, document_type) returns the (content,
+    status_code) pair /validate would have answered with.
+    """
+
+    def __init__(self, store: JobStore, process_fn, workers: int = JOB_WORKERS,
+                 poll_interval: float = JOB_POLL_INTERVAL):
+        self.store = store
+        self.process_fn = process_fn
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.wakeup = asyncio.Event()
+        self.tasks = []
+
+    def notify(self):
+        """Wake idle workers after a submission on this instance."""
+        self.wakeup.set()
+
+    async def start(self):
+        if self.workers <= 0:
+            return
+        await self._requeue_stale()
+        self.tasks = [asyncio.create_task(self._work(i)) for i in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self._watch_stale()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def _requeue_stale(self):
+        requeued = await self.store.requeue_stale(JOB_STALE_SECONDS)
+        if requeued:
+            logger.info(f"Requeued {requeued} stale job(s)")
+            self.notify()
+
+    async def _watch_stale(self):
+        """Requeue jobs of workers that died, on any instance, while this one keeps running."""
+        while True:
+            await asyncio.sleep(REQUEUE_INTERVAL)
+            try:
+                await self._requeue_stale()
+            except Exception as e:
+                logger.error(f"Could not requeue stale jobs: {e}")
+
+    async def _work(self, worker_id: int):
+        while True:
+            try:
+                job = await self.store.claim()
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run(job)
+            except Exception:
+                # The worker must outlive any one job; if its result was not stored it is requeued once stale
+                logger.exception(f"Job worker {worker_id} failed on job {job['_id']}")
+
+    async def _run(self, job: dict):
+        job_id = job["_id"]
+        logger.info(f"Running job {job_id}")
+        # Downstream OCR and LLM logs for this job carry its id
+        token = request_id_var.set(job_id)
+        try:
+            data = await self.store.read_upload(job)
+            content, status_code = await self.process_fn(data, job["content_type"], job["document_type"])
+            status = "done"
+            error = None
+        except HTTPException as e:
+            content, status_code, status, error = None, e.status_code, "failed", str(e.detail)
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            content, status_code, status, error = None, 500, "failed", "An internal server error occurred."
+        finally:
+            request_id_var.reset(token)
+
+        await self._finish(job, status, content, status_code, error)
+
+        if job.get("callback_url"):
+            await send_callback(job["callback_url"], {
+                "job_id": job_id, "status": status, "status_code": status_code, "result": content, "error": error,
+            })
+
+
+    async def _finish(self, job: dict, status: str, content, status_code: int, error: str):
+        """Store the job's result, retrying transient Mongo errors."""
+        delay = FINISH_RETRY_DELAY
+        for attempt in range(1, FINISH_ATTEMPTS + 1):
+            try:
+                await self.store.finish(job["_id"], status, content, status_code, error, job.get("file_id"))
+                return
+            except Exception as e:
+                if attempt == FINISH_ATTEMPTS:
+                    raise
+                logger.warning(f"Storing the result of job {job['_id']} failed, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+
+async def send_callback(callback_url: str, payload: dict):
+    if not callback_allowed(callback_url):
+        logger.error(f"Webhook to {callback_url} skipped, its host is not in JOB_CALLBACK_HOSTS")
+        return
+    try:
+        response = await get_http_client().post(callback_url, json=payload, timeout=10.0, follow_redirects=False)
+        response.raise_for_status()
+    except Exception as e:
+        logger.error(f"Webhook to {callback_url} failed: {e}")
+
+
+async def run_workers():
+    """Run job workers without the API, so they can be scaled separately."""
+    from .main import run_validation
+    from .balancer import start_balancers, stop_balancers
+    from .cpu_pool import start_cpu_pool, stop_cpu_pool
+
+    start_http_client()
+    start_balancers()
+    start_cpu_pool()
+    pool = JobWorkerPool(JobStore(), run_validation, workers=max(JOB_WORKERS, 1))
+    await pool.start()
+    try:
+        await asyncio.gather(*pool.tasks)
+    finally:
+        await pool.stop()
+        await asyncio.to_thread(stop_cpu_pool)
+        await stop_balancers()
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_workers())
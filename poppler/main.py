@@ -1,30 +1,40 @@
 # Installed Libraries
 import uvicorn
-import torch
-from fastapi import FastAPI, File, UploadFile, Form
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.security import HTTPBearer
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Internal Libraries
-from .process_pdf import process_pdf_file, logger
-from config.settings import CUDA_CONFIGURED, IS_CUDA_CHECK_NEEDED
+from .process_pdf import process_document, logger
+from .http_client import start_http_client, close_http_client
+from .balancer import start_balancers, stop_balancers, ocr_pool, llm_pool
+from .cpu_pool import start_cpu_pool, stop_cpu_pool
+from .jobs import JobStore, JobWorkerPool, serialize, callback_allowed
+from common.metrics import instrument_app, timed
+from config.settings import JOBS_ENABLED
 
 # Python Libraries
+import asyncio
+from typing import List
 
-if CUDA_CONFIGURED=='1':
-    torch.cuda.empty_cache()
-    torch.cuda.ipc_collect()
-
-if IS_CUDA_CHECK_NEEDED == '1':
-    if torch.cuda.is_available():
-        logger.info("GPU Available")
-    else:
-        logger.error("GPU not accessible, stopping program")
-        exit()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP client per process, shared by every OCR/LLM call
+    start_http_client()
+    start_balancers()
+    start_cpu_pool()
+    if JOBS_ENABLED == '1':
+        await job_workers.start()
+    yield
+    await job_workers.stop()
+    await asyncio.to_thread(stop_cpu_pool)
+    await stop_balancers()
+    await close_http_client()
 
 # Initialize the FastAPI application
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +45,8 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+instrument_app(app, "poppler")
+
 prompt_schema = {
     "aadhaar": {
         "name": "String",
@@ -109,25 +121,18 @@ prompt_schema = {
 
 # Security scheme for HTTPBearer
 security = HTTPBearer()
-    
-@app.post("/validate")
-async def validate(
-    file: UploadFile = File(...)
-):
-    document_type = "aadhaar"
-    schema = prompt_schema[document_type]
 
-    result = await process_pdf_file(file, schema, document_type)
-    try:
-        result = eval(result['result'])
-    except Exception as e:
-        logger.error(f"Error evaluating result: {e}")
-        return JSONResponse(content={"error": "Error processing the file"}, status_code=500)
-    
-    print("LLM Result: ", result)
+def build_verdict(result: list, schema: dict, document_type: str):
+    """
+    Turn the extracted array into the /validate response.
+
+    Returns:
+        tuple: (response content, HTTP status code).
+    """
+    logger.info(f"LLM Result: {result}")
     if result[0] != document_type:
-        return JSONResponse(content={"error": f"Document type mismatch, please provide {document_type} in this section."}, status_code=400)
-    
+        return {"error": f"Document type mismatch, please provide {document_type} in this section."}, 400
+
     index = 1
     messages = []
     is_all_valid = True
@@ -141,9 +146,115 @@ async def validate(
         index += 1
 
     if is_all_valid:
-        return JSONResponse(content={"message": "Document is valid", "messages": messages}, status_code=200)
+        return {"message": "Document is valid", "messages": messages}, 200
     else:
-        return JSONResponse(content={"messages": messages, "entity": result}, status_code=200)
+        return {"messages": messages, "entity": result}, 200
+
+async def run_validation(data: bytes, content_type: str, document_type: str):
+    """Run the full pipeline on an upload and build the /validate response for it."""
+    schema = prompt_schema[document_type]
+    try:
+        result = await process_document(data, content_type, schema, document_type)
+    except ValueError as e:
+        logger.error(f"Error evaluating result: {e}")
+        return {"error": "Error processing the file"}, 500
+    return build_verdict(result['result'], schema, document_type)
+
+job_store = JobStore()
+job_workers = JobWorkerPool(job_store, run_validation)
+
+async def read_upload(file: UploadFile) -> bytes:
+    file.file.seek(0)
+    with timed("poppler", "upload_save"):
+        return await file.read()
+
+@app.post("/validate")
+async def validate(
+    file: UploadFile = File(...)
+):
+    document_type = "aadhaar"
+
+    content, status_code = await run_validation(await read_upload(file), file.content_type, document_type)
+    return JSONResponse(content=content, status_code=status_code)
+
+async def validate_packet_document(file: UploadFile, document_type: str) -> dict:
+    data = await read_upload(file)
+    try:
+        content, status_code = await run_validation(data, file.content_type, document_type)
+    except HTTPException as e:
+        content, status_code = {"error": e.detail}, e.status_code
+    except Exception:
+        # One broken document must not fail the rest of the packet
+        logger.exception(f"Failed to validate {file.filename}")
+        content, status_code = {"error": "Error processing the file"}, 500
+    return {"filename": file.filename, "document_type": document_type, "status_code": status_code, **content}
+
+@app.post("/validate-packet")
+async def validate_packet(
+    files: List[UploadFile] = File(...),
+    document_types: List[str] = Form(...)
+):
+    """
+    Validate all of an applicant's documents in one request. files[i] is
+    validated as document_types[i]. Documents run concurrently, so OCR of one
+    overlaps the LLM call of another, and share the connection pool and the
+    OCR concurrency limits.
+    """
+    if len(files) != len(document_types):
+        raise HTTPException(status_code=400, detail="Provide exactly one document type per file")
+    unknown = [document_type for document_type in document_types if document_type not in prompt_schema]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown document types: {', '.join(unknown)}")
+
+    documents = await asyncio.gather(*(
+        validate_packet_document(file, document_type) for file, document_type in zip(files, document_types)
+    ))
+    is_all_valid = all(document["status_code"] == 200 and "message" in document for document in documents)
+    return JSONResponse(content={"valid": is_all_valid, "documents": documents}, status_code=200)
+
+@app.get("/backends")
+async def backends():
+    return {"ocr": ocr_pool.stats(), "llm": llm_pool.stats()}
+
+def require_jobs():
+    if JOBS_ENABLED != '1':
+        raise HTTPException(status_code=404, detail="Job API is disabled")
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    document_type: str = Form("aadhaar"),
+    callback_url: str = Form(None)
+):
+    require_jobs()
+    if document_type not in prompt_schema:
+        raise HTTPException(status_code=400, detail=f"Unknown document type: {document_type}")
+    if callback_url and not callback_allowed(callback_url):
+        raise HTTPException(status_code=400, detail="callback_url must be an http(s) URL on an allowed host")
+
+    job_id = await job_store.create(await read_upload(file), file.content_type, file.filename, document_type, callback_url)
+    job_workers.notify()
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    require_jobs()
+    job = await job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return serialize(job)
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    require_jobs()
+    job = await job_store.get(job_id, with_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        return JSONResponse(content={"error": job.get("error")}, status_code=job.get("status_code") or 500)
+    if job["status"] != "done":
+        return JSONResponse(content=serialize(job), status_code=202)
+    return JSONResponse(content=job["result"], status_code=job["status_code"])
 
 
 # Main entry point for running the app
@@ -0,0 +1,164 @@
+# Internal Libraries
+from .cpu_pool import hand_off
+
+# Python Libraries
+from typing import NamedTuple
+
+
+class PreprocessProfile(NamedTuple):
+    """How pages of a document type are cleaned up before OCR."""
+    # Long side in pixels pages are scaled down to, about what Surya needs for the type's smallest text
+    max_side: int
+    deskew: bool = True
+    crop_borders: bool = True
+    # Adaptive binarization, which also drops light watermarks and background patterns
+    binarize: bool = False
+
+
+# 2339px is the long side of an A4 page at the 200 DPI poppler renders at
+DEFAULT_PROFILE = PreprocessProfile(max_side=2000)
+
+PROFILES = {
+    # Cards and single-page certificates with large print
+    "aadhaar": PreprocessProfile(max_side=1600),
+    "proof_of_address": PreprocessProfile(max_side=1600),
+    "proof_of_category": PreprocessProfile(max_side=1600),
+    "birth_cert": PreprocessProfile(max_side=1800),
+    "experience_cert": PreprocessProfile(max_side=1800),
+    "provisional_cert": PreprocessProfile(max_side=1800),
+    "degree_cert": PreprocessProfile(max_side=1800),
+    "phd_cert": PreprocessProfile(max_side=1800),
+    # Small print in mark tables
+    "marksheet": PreprocessProfile(max_side=2300),
+    "proof_of_class": PreprocessProfile(max_side=2300),
+    # Score cards carry a background watermark over the values
+    "gate_score_card": PreprocessProfile(max_side=2000, binarize=True),
+}
+
+# Skew angles searched, in degrees. Smaller angles do not hurt OCR and are left alone,
+# larger ones are rotated pages rather than tilted scans
+MIN_SKEW = 0.3
+MAX_SKEW = 10.0
+
+# Dark pixels count as ink below this level
+INK_LEVEL = 160
+
+
+def get_profile(document_type: str) -> PreprocessProfile:
+    return PROFILES.get(document_type, DEFAULT_PROFILE)
+
+
+def rotate(image, angle: float, border: int):
+    import cv2
+
+    height, width = image.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR, borderValue=border)
+
+
+def detect_skew(gray) -> float:
+    """
+    Rotation in degrees that straightens the text lines. Each candidate angle
+    is scored by how sharply the rotated ink's row sums alternate between
+    text lines and the gaps between them.
+    """
+    import cv2
+    import numpy as np
+
+    # A coarse copy is plenty to estimate the angle
+    scale = min(1.0, 800 / max(gray.shape))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    _, ink = cv2.threshold(small, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if ink.sum() < 100:
+        return 0.0
+
+    def score(angle):
+        rows = rotate(ink, angle, 0).sum(axis=1, dtype=np.int64)
+        return float(np.square(np.diff(rows)).sum())
+
+    angles = np.arange(-MAX_SKEW, MAX_SKEW + 0.25, 0.5)
+    scores = [score(angle) for angle in angles]
+    return float(angles[int(np.argmax(scores))])
+
+
+def deskew(gray):
+    angle = detect_skew(gray)
+    if abs(angle) < MIN_SKEW:
+        return gray
+    return rotate(gray, angle, 255)
+
+
+def crop_borders(gray, margin: int = 16):
+    """
+    Crop to the content. Rows and columns that are almost entirely dark are
+    scanner borders or shadows, not content, and are cropped as well.
+    """
+    import numpy as np
+
+    ink = gray < INK_LEVEL
+    row_ink = ink.mean(axis=1)
+    col_ink = ink.mean(axis=0)
+    rows = np.flatnonzero((row_ink > 0.002) & (row_ink < 0.9))
+    cols = np.flatnonzero((col_ink > 0.002) & (col_ink < 0.9))
+    if rows.size == 0 or cols.size == 0:
+        return gray
+    top, bottom = max(rows[0] - margin, 0), min(rows[-1] + margin + 1, gray.shape[0])
+    left, right = max(cols[0] - margin, 0), min(cols[-1] + margin + 1, gray.shape[1])
+    return gray[top:bottom, left:right]
+
+
+def downscale(gray, max_side: int):
+    import cv2
+
+    scale = max_side / max(gray.shape)
+    if scale >= 1:
+        return gray
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+def binarize(gray):
+    """Adaptive threshold, so uneven lighting and light watermarks turn white while text stays black."""
+    import cv2
+
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+
+def preprocess_array(gray, profile: PreprocessProfile):
+    """
+    Clean up a grayscale page held as a uint8 array: deskew, crop borders,
+    scale down to the profile's resolution and optionally binarize.
+    """
+    if profile.deskew:
+        gray = deskew(gray)
+    if profile.crop_borders:
+        gray = crop_borders(gray)
+    gray = downscale(gray, profile.max_side)
+    if profile.binarize:
+        gray = binarize(gray)
+    return gray
+
+
+def encode_png(gray) -> bytes:
+    import cv2
+
+    # Low compression, the page is uploaded over the LAN right away
+    _, encoded = cv2.imencode(".png", gray, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    return encoded.tobytes()
+
+
+def preprocess_image(image_data: bytes, document_type: str):
+    """
+    Decode an uploaded image straight to grayscale, preprocess it for the
+    document type and re-encode it as PNG. Runs on the CPU pool.
+
+    Returns:
+        The PNG, through hand_off. None if the image cannot be decoded, so the
+        caller can send the original.
+    """
+    import cv2
+    import numpy as np
+
+    gray = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+    return hand_off(encode_png(preprocess_array(gray, get_profile(document_type))))
@@ -4,41 +4,45 @@ import httpx
 import logging
 import shutil
 from fastapi import File, UploadFile, HTTPException
-from pdf2image import convert_from_path
-from torchvision import transforms
-import cv2
 
 # Internal Libraries
-from config import OCR_SERVER_IP, LLM_SERVER_IP
+from config import (
+    OCR_PAGE_CONCURRENCY,
+    OCR_GLOBAL_CONCURRENCY,
+    POPPLER_DEBUG_FILES,
+    OCR_PDF_PASSTHROUGH,
+    RULES_MIN_CONFIDENCE,
+    CLASSIFIER_ENABLED,
+    CLASSIFIER_MIN_CONFIDENCE,
+    CLASSIFIER_MIN_SCORE,
+    POPPLER_RENDER_WINDOW,
+    POPPLER_MAX_RESIDENT_PAGES,
+    DOCUMENT_PAGE_RANGES,
+    POPPLER_PREPROCESS,
+    POPPLER_PAGE_TRANSPORT,
+)
+from .http_client import get_http_client, OCR_TIMEOUT, LLM_TIMEOUT
+from .balancer import ocr_pool, llm_pool
+from .rules import extract_fields
+from .classifier import check_document_type, DocumentTypeMismatch
+from .cpu_pool import cpu_pool
+from .raster import render_pdf_window, pdf_page_count
+from .preprocess import preprocess_image
+from common.metrics import timed, get_request_id, PAGES
+from common.page_codec import CONTENT_TYPE as PAGE_FRAMES_CONTENT_TYPE, CODEC_PREFERENCE, codec_available
 
 # Python Libraries
-import time
+import ast
+import asyncio
 import os
-from datetime import datetime
-import concurrent.futures
+import tempfile
+import uuid
+from contextlib import asynccontextmanager
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-# Function to remove watermark from an image using thresholding
-def remove_watermark(image_path):
-    # Read the image
-    img = cv2.imread(image_path, 1)
-
-    # Apply a threshold to remove the watermark
-    img1 = cv2.imread(image_path)
-    _, thresh = cv2.threshold(img1, 150, 255, cv2.THRESH_BINARY)
-
-    # Generate a timestamp for the output file name
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    output_path = f"gate_score_without_watermark_{timestamp}.jpg"
-
-    # Save the image after thresholding (watermark removed)
-    cv2.imwrite(output_path, thresh)
-    return output_path
-
-
 poppler_path = r"C:\Program Files\Release-24.08.0-0\poppler-24.08.0\Library\bin"
 IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
 
@@ -47,127 +51,371 @@ def clear_images_directory():
         shutil.rmtree(IMAGES_DIR)
     os.makedirs(IMAGES_DIR)
 
-clear_images_directory()
+if POPPLER_DEBUG_FILES == '1':
+    clear_images_directory()
 
-async def save_file(file: UploadFile, extension: str) -> str:
-    file_path = os.path.join(IMAGES_DIR, f"uploaded_{int(time.time())}.{extension}")
-    file.file.seek(0)
-    
+async def save_debug_file(request_id: str, name: str, data: bytes):
+    """Write an intermediate buffer to disk, only when POPPLER_DEBUG_FILES is enabled."""
+    if POPPLER_DEBUG_FILES != '1':
+        return
+    # One directory per request so concurrent requests never share file names
+    request_dir = os.path.join(IMAGES_DIR, request_id)
+    os.makedirs(request_dir, exist_ok=True)
+    file_path = os.path.join(request_dir, name)
     async with aiofiles.open(file_path, "wb") as f:
-        await f.write(await file.read())
-    
-    logger.info(f"File saved at {file_path}")
-    return file_path
-
-async def save_image_file(file: UploadFile, document_type: str) -> str:
-    allowed_formats = {"image/png": "png", "image/jpeg": "jpg"}
-    extension = allowed_formats.get(file.content_type)
-    if not extension:
-        logger.error(f"Unsupported image format: {file.content_type}")
-        raise HTTPException(status_code=400, detail="Unsupported image format")
-    
-    normal_path = await save_file(file, extension)
-    return normal_path
-
-async def extract_text_from_image(image_path: str, document_type) -> str:
-    if document_type == "gate_score":
-        return remove_watermark(image_path)
-    async with aiofiles.open(image_path, "rb") as f:
-        image_data = await f.read()
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(
-                f"http://{OCR_SERVER_IP}:8001/extract-text",
-                files={"file": (os.path.basename(image_path), image_data, "image/png")}
-            )
+        await f.write(data)
+    logger.info(f"Debug file saved at {file_path}")
+
+ALLOWED_IMAGE_FORMATS = {"image/png": "png", "image/jpeg": "jpg"}
+
+def page_range(document_type: str):
+    """First and last page (1-based, inclusive) read for a document type, last is None for all pages."""
+    return DOCUMENT_PAGE_RANGES.get(document_type, (1, None))
+
+async def extract_text_from_image(image_data: bytes, filename: str, document_type, content_type: str = "image/png",
+                                  preprocessed: bool = False, first_page: int = None) -> dict:
+    if POPPLER_PREPROCESS == '1' and not preprocessed and content_type in ALLOWED_IMAGE_FORMATS:
+        # Grayscale, deskewed, cropped and scaled down for the document type, so less to send and recognize
+        with timed("poppler", "preprocessing"):
+            processed = await cpu_pool.run(preprocess_image, image_data, document_type)
+        if processed is not None:
+            image_data, content_type = processed, "image/png"
+            filename = os.path.splitext(filename)[0] + ".png"
+
+    client = get_http_client()
+    form = {}
+    if document_type:
+        form["document_type"] = document_type
+    if content_type == "application/pdf":
+        # The OCR server skips the pages this document type does not need
+        first_page, last_page = page_range(document_type)
+        form["first_page"] = str(first_page)
+        if last_page is not None:
+            form["last_page"] = str(last_page)
+    elif first_page is not None:
+        # Page frames of a render window, numbered from the window's first page
+        form["first_page"] = str(first_page)
+
+    def send(base_url):
+        return client.post(
+            f"{base_url}/extract-text",
+            files={"file": (filename, image_data, content_type)},
+            data=form or None,
+            timeout=OCR_TIMEOUT
+        )
+
+    try:
+        with timed("poppler", "ocr_request"):
+            response = await ocr_pool.request(send, content_type)
             response.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"API Error: {e.response.text}")
-            raise HTTPException(status_code=500, detail="Text extraction API failed")
-        except Exception as e:
-            logger.error(f"HTTP request error: {e}")
-            raise HTTPException(status_code=500, detail="Unable to connect to text extraction API")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"API Error: {e.response.text}")
+        raise HTTPException(status_code=500, detail="Text extraction API failed")
+    except Exception as e:
+        logger.error(f"HTTP request error: {e}")
+        raise HTTPException(status_code=500, detail="Unable to connect to text extraction API")
 
-        return response.json()
+    return response.json()
 
-async def convert_pdf_to_images(pdf_path: str) -> list:
-    images = convert_from_path(pdf_path, dpi=200)
-    transform = transforms.ToTensor()
+async def extract_entities(raw_text: str, schema: dict, document_type: str = None) -> dict:
+    client = get_http_client()
 
-    def process_image(i, image):
-        image_tensor = transform(image)
-        output_image = transforms.ToPILImage()(image_tensor.cpu())
-        image_path = os.path.join(IMAGES_DIR, f'page_{i + 1}.png')
-        output_image.save(image_path, quality=95)
-        return image_path
+    def send(base_url):
+        return client.post(
+            f"{base_url}/process-data",
+            json={"raw_text": raw_text, "schema": schema, "document_type": document_type},
+            timeout=LLM_TIMEOUT
+        )
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(process_image, i, image) for i, image in enumerate(images)]
-        processed_images = [future.result() for future in concurrent.futures.as_completed(futures)]
+    try:
+        with timed("poppler", "llm_request"):
+            response = await llm_pool.request(send, "process-data")
+            response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"API Error: {e.response.text}")
+        raise HTTPException(status_code=500, detail="Data processing API failed")
+    except Exception as e:
+        logger.error(f"HTTP request error: {e}")
+        raise HTTPException(status_code=500, detail="Unable to connect to data processing API")
 
-    return processed_images
+    return response.json()
 
-async def process_pdf_file(file: UploadFile = File(...), schema: str = None, document_type: str = None):
+# Caps the OCR requests in flight across every /validate call on this server
+ocr_global_semaphore = asyncio.Semaphore(OCR_GLOBAL_CONCURRENCY)
+
+def classify_document(text: str, document_type: str):
+    """
+    Reject confident document type mismatches before any LLM call.
+
+    Returns:
+        dict: The classification, or None when the classifier is disabled.
 
-    processed_images = []
-    image_path = None
+    Raises:
+        DocumentTypeMismatch: If the text confidently belongs to another type.
+    """
+    if CLASSIFIER_ENABLED != '1' or not document_type:
+        return None
+    classification = check_document_type(text, document_type, CLASSIFIER_MIN_CONFIDENCE, CLASSIFIER_MIN_SCORE)
+    return classification._asdict()
+
+@asynccontextmanager
+async def staged_pdf(pdf_data: bytes):
+    """
+    Write an uploaded PDF to a temporary file for the rasterizer, once per
+    document rather than once per rendered window.
+
+    Yields:
+        tuple: (path of the PDF, its page count).
+    """
+    temp_dir = await asyncio.to_thread(tempfile.mkdtemp)
+    pdf_path = os.path.join(temp_dir, "upload.pdf")
     try:
-        if file.content_type == "application/pdf":
-            pdf_path = await save_file(file, "pdf")
-            processed_images = await convert_pdf_to_images(pdf_path)
+        async with aiofiles.open(pdf_path, "wb") as f:
+            await f.write(pdf_data)
+        page_count = await cpu_pool.run(pdf_page_count, pdf_path)
+        yield pdf_path, page_count
+    finally:
+        await asyncio.to_thread(shutil.rmtree, temp_dir, True)
 
-            extracted_texts = []
-            for image_path in processed_images:
-                text = await extract_text_from_image(image_path, document_type)
-                extracted_texts.append(text['extracted_text'])
+def page_windows(first_page: int, last_page: int, window: int = POPPLER_RENDER_WINDOW) -> list:
+    window = max(window, 1)
+    return [(start, min(start + window - 1, last_page)) for start in range(first_page, last_page + 1, window)]
 
-            combined_text = "\n\n".join(extracted_texts)
+def page_transport() -> str:
+    """
+    How rendered pages are sent to OCR: "png" for one PNG upload per page, or
+    a page frames codec every healthy OCR replica reported it can decode.
+    """
+    if POPPLER_PAGE_TRANSPORT == "png":
+        return "png"
+    supported = ocr_pool.common_capability("page_codecs")
+    if POPPLER_PAGE_TRANSPORT == "auto":
+        # Raw frames are only worth it when asked for, they are several times larger than PNG
+        candidates = [codec for codec in CODEC_PREFERENCE if codec != "raw"]
+    else:
+        candidates = [POPPLER_PAGE_TRANSPORT]
+    for codec in candidates:
+        if codec in supported and codec_available(codec):
+            return codec
+    return "png"
+
+async def rasterize_window(pdf_path: str, first_page: int, last_page: int, document_type: str = None,
+                           transport: str = "png") -> list:
+    """
+    Render, preprocess for document_type and encode a range of pages on the CPU pool.
+
+    Returns:
+        list: One PNG per page, or with a page frames transport a single buffer holding every page.
+    """
+    preprocess = POPPLER_PREPROCESS == '1' and document_type is not None
+    with timed("poppler", "rasterization"):
+        pages = await cpu_pool.run(render_pdf_window, pdf_path, first_page, last_page, document_type, preprocess, transport)
+    PAGES.labels("poppler", "rasterized").inc(last_page - first_page + 1)
+    return pages
+
+async def convert_pdf_to_images(pdf_data: bytes) -> list:
+    """Rasterize a PDF held in memory into PNG-encoded pages, in page order."""
+    async with staged_pdf(pdf_data) as (pdf_path, page_count):
+        windows = await asyncio.gather(*(
+            rasterize_window(pdf_path, first, last) for first, last in page_windows(1, page_count)
+        ))
+    return [page for window in windows for page in window]
+
+async def extract_texts_from_pdf(pdf_data: bytes, document_type, request_id: str) -> list:
+    """
+    Rasterize a PDF window by window on the CPU pool and OCR each page as soon
+    as its window is rendered (the whole window in one request with a page
+    frames transport), so rendering, uploads and OCR overlap and
+    several windows render in parallel. At most POPPLER_MAX_RESIDENT_PAGES
+    rendered pages wait for OCR at once; rendering pauses until one window's
+    pages are done. Only the document type's page range is rendered.
+
+    The first page is classified as soon as its text arrives; on a confident
+    document type mismatch rendering stops and pending pages are cancelled.
+
+    Returns:
+        list: Extracted text of each rendered page, in page order.
+
+    Raises:
+        DocumentTypeMismatch: If the first page belongs to another document type.
+    """
+    request_semaphore = asyncio.Semaphore(OCR_PAGE_CONCURRENCY)
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                try:
-                    response = await client.post(
-                        f"http://{LLM_SERVER_IP}:8002/process-data",
-                        json={"raw_text": combined_text, "schema": schema}
-                    )
-                    response.raise_for_status()
-                except httpx.HTTPStatusError as e:
-                    logger.error(f"API Error: {e.response.text}")
-                    raise HTTPException(status_code=500, detail="Data processing API failed")
-                except Exception as e:
-                    logger.error(f"HTTP request error: {e}")
-                    raise HTTPException(status_code=500, detail="Unable to connect to data processing API")
-
-                return response.json()
-
-        elif file.content_type.startswith("image/"):
-            image_path = await save_image_file(file, document_type)
-            text = await extract_text_from_image(image_path, document_type)
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                try:
-                    response = await client.post(
-                        f"http://{LLM_SERVER_IP}:8002/process-data",
-                        json={"raw_text": text['extracted_text'], "schema": schema}
-                    )
-                    response.raise_for_status()
-                except httpx.HTTPStatusError as e:
-                    logger.error(f"API Error: {e.response.text}")
-                    raise HTTPException(status_code=500, detail="Data processing API failed")
-                except Exception as e:
-                    logger.error(f"HTTP request error: {e}")
-                    raise HTTPException(status_code=500, detail="Unable to connect to data processing API")
-                
-                return response.json()
+    async def extract_page(page_number, image_data):
+        await save_debug_file(request_id, f"page_{page_number}.png", image_data)
+        async with request_semaphore, ocr_global_semaphore:
+            text = await extract_text_from_image(image_data, f"page_{page_number}.png", document_type, preprocessed=True)
+        return text['extracted_text']
 
+    async def extract_frames(first, last, frames):
+        await save_debug_file(request_id, f"pages_{first}-{last}.frames", frames)
+        async with request_semaphore, ocr_global_semaphore:
+            text = await extract_text_from_image(
+                frames, f"pages_{first}-{last}.frames", document_type, PAGE_FRAMES_CONTENT_TYPE, preprocessed=True,
+                first_page=first
+            )
+        return text['page_texts']
+
+    async def extract_window(first, last, check_document_type):
+        try:
+            page_images = await rasterize_window(pdf_path, first, last, document_type, transport)
+            if transport != "png":
+                # The whole window goes to OCR in one request
+                page_texts = await extract_frames(first, last, page_images[0])
+                if check_document_type:
+                    classify_document(page_texts[0], document_type)
+                return page_texts
+
+            page_tasks = [
+                asyncio.create_task(extract_page(first + i, image_data)) for i, image_data in enumerate(page_images)
+            ]
+            try:
+                if check_document_type:
+                    classify_document(await page_tasks[0], document_type)
+                # gather() returns results in argument order regardless of completion order
+                return await asyncio.gather(*page_tasks)
+            finally:
+                for task in page_tasks:
+                    task.cancel()
+        finally:
+            resident.release()
+
+    first_page, last_page = page_range(document_type)
+    transport = page_transport()
+    async with staged_pdf(pdf_data) as (pdf_path, page_count):
+        last_page = page_count if last_page is None else min(last_page, page_count)
+        windows = page_windows(first_page, last_page)
+        window_size = max(POPPLER_RENDER_WINDOW, 1)
+        resident = asyncio.Semaphore(max(POPPLER_MAX_RESIDENT_PAGES // window_size, 1))
+
+        tasks = []
+        try:
+            for first, last in windows:
+                await resident.acquire()
+                # Surfaces a mismatch or failure of the first window before rendering more
+                if tasks and tasks[0].done():
+                    tasks[0].result()
+                check_document_type = not tasks and last_page > first_page
+                tasks.append(asyncio.create_task(extract_window(first, last, check_document_type)))
+            texts = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Let cancelled windows finish before their PDF is deleted
+            await asyncio.gather(*tasks, return_exceptions=True)
+    return [text for window in texts for text in window]
+
+def parse_extraction(extracted_string: str) -> list:
+    """
+    Parse the LLM's array output, e.g. "['aadhaar', 'John', '']", into a list.
+
+    Raises:
+        ValueError: If the output is not an array literal.
+    """
+    try:
+        with timed("poppler", "parse"):
+            result = ast.literal_eval(extracted_string.strip())
+    except (ValueError, SyntaxError) as e:
+        raise ValueError(f"Error converting extracted string to list: {e}")
+    if not isinstance(result, list) or not result:
+        raise ValueError("Extracted output is not a non-empty array")
+    return result
+
+def mismatch_result(mismatch: DocumentTypeMismatch) -> dict:
+    classification = mismatch.classification
+    logger.info(f"Classified as {classification.document_type} ({classification.confidence:.2f}), skipping LLM")
+    return {"result": [classification.document_type], "sources": {}, "classification": classification._asdict()}
+
+async def extract_document_entities(raw_text: str, schema: dict, document_type: str) -> dict:
+    """
+    Fill the schema from OCR text, using deterministic rules first and the LLM
+    only for the fields the rules could not fill confidently.
+
+    Returns:
+        dict: "result" holds [document_type, value per schema key...] and
+        "sources" records whether each key came from "rules" or "llm".
+        On a document type mismatch "result" is only [detected document_type].
+    """
+    try:
+        with timed("poppler", "classify"):
+            classification = classify_document(raw_text, document_type)
+    except DocumentTypeMismatch as e:
+        return mismatch_result(e)
+
+    with timed("poppler", "rules"):
+        rule_values = {
+            key: value
+            for key, (value, confidence) in extract_fields(document_type, raw_text).items()
+            if key in schema and confidence >= RULES_MIN_CONFIDENCE
+        }
+    remaining_schema = {key: value for key, value in schema.items() if key not in rule_values}
+    sources = {key: "rules" if key in rule_values else "llm" for key in schema}
+
+    if not remaining_schema:
+        logger.info("All fields filled by rules, skipping LLM")
+        result = [document_type] + [rule_values[key] for key in schema]
+        return {"result": result, "sources": sources, "classification": classification}
+
+    response = await extract_entities(raw_text, remaining_schema, document_type)
+    logger.info(f"LLM prompt: ~{response.get('prompt_tokens')} token(s), ~{response.get('prompt_tokens_saved')} saved by compaction")
+    llm_values = parse_extraction(response['result'])
+    if llm_values[0] != document_type:
+        # Let the caller report the mismatch, rule values are irrelevant then
+        return {"result": llm_values, "sources": sources, "classification": classification}
+
+    llm_by_key = dict(zip(remaining_schema, llm_values[1:]))
+    result = [document_type] + [
+        rule_values[key] if key in rule_values else llm_by_key.get(key, '')
+        for key in schema
+    ]
+    return {"result": result, "sources": sources, "classification": classification}
+
+async def process_document(data: bytes, content_type: str, schema: dict = None, document_type: str = None):
+    """
+    Run the OCR and extraction pipeline on an uploaded document held in memory.
+
+    Args:
+        data (bytes): Raw bytes of the uploaded PDF or image.
+        content_type (str): MIME type reported for the upload.
+        schema (dict): Keys to extract and their expected types.
+        document_type (str): Expected document type.
+
+    Returns:
+        dict: See extract_document_entities.
+    """
+    request_id = get_request_id() or uuid.uuid4().hex
+
+    if content_type == "application/pdf":
+        await save_debug_file(request_id, "uploaded.pdf", data)
+        if OCR_PDF_PASSTHROUGH == '1':
+            # The OCR server renders the PDF itself, so it is sent once as-is
+            async with ocr_global_semaphore:
+                text = await extract_text_from_image(data, "uploaded.pdf", document_type, "application/pdf")
+            combined_text = text['extracted_text']
         else:
-            logger.error("Invalid file format")
-            raise HTTPException(status_code=400, detail="Invalid file format. Only PDF or image files are allowed.")
-    finally:
-        if file.content_type == "application/pdf" and processed_images:
-            for image_path in processed_images:
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-            os.remove(pdf_path)
-        elif file.content_type.startswith("image/") and image_path:
-            if os.path.exists(image_path):
-                os.remove(image_path)
\ No newline at end of file
+            try:
+                extracted_texts = await extract_texts_from_pdf(data, document_type, request_id)
+            except DocumentTypeMismatch as e:
+                return mismatch_result(e)
+            combined_text = "\n\n".join(extracted_texts)
+
+        return await extract_document_entities(combined_text, schema, document_type)
+
+    elif content_type.startswith("image/"):
+        extension = ALLOWED_IMAGE_FORMATS.get(content_type)
+        if not extension:
+            logger.error(f"Unsupported image format: {content_type}")
+            raise HTTPException(status_code=400, detail="Unsupported image format")
+
+        await save_debug_file(request_id, f"uploaded.{extension}", data)
+        text = await extract_text_from_image(data, f"uploaded.{extension}", document_type, content_type)
+        return await extract_document_entities(text['extracted_text'], schema, document_type)
+
+    else:
+        logger.error("Invalid file format")
+        raise HTTPException(status_code=400, detail="Invalid file format. Only PDF or image files are allowed.")
+
+async def process_pdf_file(file: UploadFile = File(...), schema: str = None, document_type: str = None):
+    file.file.seek(0)
+    data = await file.read()
+    return await process_document(data, file.content_type, schema, document_type)
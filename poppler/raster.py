@@ -0,0 +1,61 @@
+# Internal Libraries
+from .cpu_pool import hand_off
+from .preprocess import get_profile, preprocess_array, encode_png
+from common.page_codec import Page, encode_pages
+
+# Python Libraries
+import io
+
+
+def encode_page(image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def pdf_page_count(pdf_path: str) -> int:
+    from pdf2image import pdfinfo_from_path
+    return pdfinfo_from_path(pdf_path)["Pages"]
+
+
+def render_pdf_window(pdf_path: str, first_page: int, last_page: int, document_type: str = None,
+                      preprocess: bool = False, transport: str = "png", dpi: int = 200) -> list:
+    """
+    Render pages first_page to last_page (1-based, inclusive), preprocessed
+    for document_type if preprocess is set, and encode them for transport:
+    "png" for a PNG per page, or a page frames codec (see common.page_codec)
+    for one buffer of raw pixels holding all of them.
+
+    The decoded pages never leave the worker; the encoded result is handed
+    back through shared memory.
+
+    Returns:
+        list: hand_off results in page order, a single one for page frames.
+    """
+    # Imported on first use, most uploads are passed through to the OCR server
+    from pdf2image import convert_from_path
+    import numpy as np
+
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page, grayscale=preprocess)
+    pages = []
+    while images:
+        image = images.pop(0)
+        if preprocess:
+            pixels = preprocess_array(np.asarray(image), get_profile(document_type))
+        elif transport != "png":
+            pixels = np.asarray(image.convert("RGB"))
+        else:
+            pages.append(hand_off(encode_page(image)))
+            continue
+
+        if transport == "png":
+            pages.append(hand_off(encode_png(pixels)))
+        else:
+            height, width = pixels.shape[:2]
+            mode = "L" if pixels.ndim == 2 else "RGB"
+            pages.append(Page(mode, width, height, np.ascontiguousarray(pixels).tobytes()))
+
+    if transport == "png":
+        return pages
+    return [hand_off(encode_pages(pages, transport))]
+
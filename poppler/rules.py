@@ -0,0 +1,220 @@
+# Python Libraries
+import re
+from datetime import date
+from typing import Callable, NamedTuple, Optional, Pattern
+
+# Confidence of a value found right after one of the field's keywords
+ANCHORED_CONFIDENCE = 0.95
+# Confidence of a value found anywhere in the text, for fields with an unmistakable format.
+# Below the default RULES_MIN_CONFIDENCE, so an unanchored value still goes to the LLM
+UNANCHORED_CONFIDENCE = 0.6
+# Applied when the text holds several different candidate values
+AMBIGUITY_PENALTY = 0.5
+
+
+class FieldRule(NamedTuple):
+    keywords: Pattern
+    value: Pattern
+    normalize: Callable[[re.Match], Optional[str]]
+    # How many characters after a keyword are searched for the value
+    window: int = 60
+    # Whether the value format alone is distinctive enough without a keyword
+    anchored_only: bool = True
+
+
+def _group(match: re.Match) -> str:
+    return match.group(1).strip()
+
+
+def _date_dmy(match: re.Match) -> Optional[str]:
+    day, month, year = (int(part) for part in match.groups())
+    if not 1900 <= year <= 2100:
+        return None
+    try:
+        # Rejects impossible dates such as 31-02-2000
+        date(year, month, day)
+    except ValueError:
+        return None
+    return f"{day:02d}-{month:02d}-{year}"
+
+
+def _aadhaar_number(match: re.Match) -> Optional[str]:
+    digits = "".join(match.groups())
+    # Aadhaar numbers never start with 0 or 1
+    return digits if digits[0] not in "01" else None
+
+
+def _gender(match: re.Match) -> str:
+    gender = match.group(1).lower()
+    if gender.startswith("f"):
+        return "Female"
+    if gender.startswith("m"):
+        return "Male"
+    return "Other"
+
+
+def _bounded_number(low: float, high: float, cast=float) -> Callable[[re.Match], Optional[str]]:
+    def normalize(match: re.Match) -> Optional[str]:
+        value = cast(match.group(1))
+        return match.group(1) if low <= value <= high else None
+    return normalize
+
+
+DATE = re.compile(r"\b(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})\b")
+YEAR = re.compile(r"\b((?:19|20)\d{2})\b")
+INTEGER = re.compile(r"\b(\d+)\b")
+DECIMAL = re.compile(r"\b(\d{1,3}(?:\.\d{1,2})?)\b")
+
+DATE_OF_BIRTH = FieldRule(
+    keywords=re.compile(r"date\s*of\s*birth|\bd\.?\s*o\.?\s*b\b|\bdob\b|birth\s*date", re.I),
+    value=DATE,
+    normalize=_date_dmy,
+)
+
+ROLL_NUMBER = FieldRule(
+    keywords=re.compile(r"roll\s*(?:no|number|num)\b\.?", re.I),
+    value=re.compile(r"\b(\d{4,15})\b"),
+    normalize=_group,
+    window=30,
+)
+
+# Compiled rules per document type, keyed by the prompt_schema field they fill
+FIELD_RULES = {
+    "aadhaar": {
+        "aadhaar_number": FieldRule(
+            keywords=re.compile(r"aadhaar|aadhar|\buid\b|your\s*aadhaar\s*no", re.I),
+            # 4-4-4 digit groups, not part of a longer number such as a 16 digit VID
+            value=re.compile(r"(?<!\d)(?<!\d[ ])(\d{4})\s?(\d{4})\s?(\d{4})(?![ ]?\d)"),
+            normalize=_aadhaar_number,
+            window=120,
+            anchored_only=False,
+        ),
+        "date_of_birth": DATE_OF_BIRTH,
+        "gender": FieldRule(
+            keywords=re.compile(r"gender|\bsex\b|dob|date\s*of\s*birth", re.I),
+            value=re.compile(r"\b(male|female|transgender)\b", re.I),
+            normalize=_gender,
+            window=80,
+            anchored_only=False,
+        ),
+    },
+    "birth_cert": {
+        "date_of_birth": DATE_OF_BIRTH,
+    },
+    "marksheet": {
+        "date_of_birth": DATE_OF_BIRTH,
+        "roll_number": ROLL_NUMBER,
+    },
+    "degree_cert": {
+        "date_of_birth": DATE_OF_BIRTH,
+        "cgpa": FieldRule(
+            keywords=re.compile(r"\bc\.?g\.?p\.?a\b", re.I),
+            value=DECIMAL,
+            normalize=_bounded_number(0, 10),
+            window=20,
+        ),
+        "percentage": FieldRule(
+            keywords=re.compile(r"percentage|\bper\s*cent\b", re.I),
+            value=DECIMAL,
+            normalize=_bounded_number(0, 100),
+            window=20,
+        ),
+    },
+    "provisional_cert": {
+        "passing_year": FieldRule(
+            keywords=re.compile(r"year\s*of\s*passing|passing\s*year|passed\s*in", re.I),
+            value=YEAR,
+            normalize=_group,
+            window=40,
+        ),
+    },
+    "gate_score_card": {
+        "registration_number": FieldRule(
+            keywords=re.compile(r"registration\s*(?:no|number)\b\.?", re.I),
+            value=re.compile(r"\b([A-Z]{2}\d{2}[A-Z]\d{5,8})\b"),
+            normalize=_group,
+            window=40,
+            anchored_only=False,
+        ),
+        "year": FieldRule(
+            keywords=re.compile(r"\bgate\b", re.I),
+            value=YEAR,
+            normalize=_group,
+            window=10,
+        ),
+        "marks_out_of_100": FieldRule(
+            keywords=re.compile(r"marks\s*out\s*of\s*100", re.I),
+            value=DECIMAL,
+            normalize=_bounded_number(0, 100),
+            window=20,
+        ),
+        "all_india_rank_in_this_paper": FieldRule(
+            keywords=re.compile(r"all\s*india\s*rank(?:\s*in\s*this\s*paper)?", re.I),
+            value=INTEGER,
+            normalize=_bounded_number(1, 10_000_000, int),
+            window=20,
+        ),
+        "gate_score": FieldRule(
+            keywords=re.compile(r"gate\s*score", re.I),
+            value=INTEGER,
+            normalize=_bounded_number(0, 1000, int),
+            window=20,
+        ),
+    },
+}
+
+
+def _candidates(rule: FieldRule, text: str, start: int = 0, end: int = None) -> list:
+    values = []
+    for match in rule.value.finditer(text, start, len(text) if end is None else end):
+        value = rule.normalize(match)
+        if value is not None:
+            values.append(value)
+    return values
+
+
+def extract_field(rule: FieldRule, text: str):
+    """
+    Apply one rule to OCR text.
+
+    Returns:
+        tuple: (value, confidence), or (None, 0.0) when nothing matched.
+    """
+    candidates = []
+    for keyword in rule.keywords.finditer(text):
+        # Only the first value after each keyword belongs to it
+        found = _candidates(rule, text, keyword.end(), keyword.end() + rule.window)
+        if found:
+            candidates.append(found[0])
+    confidence = ANCHORED_CONFIDENCE
+
+    if not candidates and not rule.anchored_only:
+        candidates = _candidates(rule, text)
+        confidence = UNANCHORED_CONFIDENCE
+
+    if not candidates:
+        return None, 0.0
+
+    distinct = list(dict.fromkeys(candidates))
+    if len(distinct) > 1:
+        confidence *= AMBIGUITY_PENALTY
+    return distinct[0], confidence
+
+
+def extract_fields(document_type: str, text: str) -> dict:
+    """
+    Run every rule defined for the document type on the OCR text.
+
+    Args:
+        document_type (str): A prompt_schema key.
+        text (str): OCR text of the whole document.
+
+    Returns:
+        dict: field -> (value, confidence) for the fields a rule matched.
+    """
+    results = {}
+    for field, rule in FIELD_RULES.get(document_type, {}).items():
+        value, confidence = extract_field(rule, text)
+        if value is not None:
+            results[field] = (value, confidence)
+    return results